@@ -5,10 +5,21 @@ Minimal KeyMaster Admin Client
 Simple admin client with core functions for managing projects and API keys.
 """
 
+import functools
 import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional, Union
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:  # orjson is optional; fall back to the stdlib parser
+    _json_loads = json.loads
+
 from src.models import (
 
     ListKeysResponse, KeyMetadata,
@@ -86,29 +97,58 @@ class KeyMasterAdminClient:
             "Content-Type": "application/json"
         }
         self.timeout = 30
+        
+        # Resolve endpoint URLs once instead of formatting them per call
+        self._endpoints = {
+            "health": self.base_url + "/health",
+            "create_project": self.base_url + "/v1/admin/create-project",
+            "mint": self.base_url + "/v1/mint-key",
+            "revoke": self.base_url + "/v1/revoke-key",
+            "list": self.base_url + "/v1/list-keys"
+        }
+        self._admin_project_prefix = self.base_url + "/v1/admin/project/"
+        
+        # Reuse one pooled session so consecutive calls share keep-alive connections
+        self._session = requests.Session()
+        self._session.headers.update(self.headers)
+        adapter = HTTPAdapter(
+            pool_connections=10,
+            pool_maxsize=20,
+            max_retries=Retry(total=3, backoff_factor=0.1, status_forcelist=[502, 503, 504])
+        )
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+    
+    def close(self) -> None:
+        """Close the underlying HTTP session and its pooled connections."""
+        self._session.close()
+    
+    def __enter__(self) -> "KeyMasterAdminClient":
+        return self
     
-    def _make_request(self, method: str, endpoint: str, **kwargs) -> requests.Response:
-        """Make an authenticated request to the API."""
-        url = f"{self.base_url}{endpoint}"
-        kwargs.setdefault('headers', self.headers)
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+    
+    def _make_request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Make an authenticated request to a fully resolved API URL."""
         kwargs.setdefault('timeout', self.timeout)
         
-        return requests.request(method, url, **kwargs)
+        return self._session.request(method, url, **kwargs)
     
     def _handle_response(self, response: requests.Response, success_model=None):
         """Handle API response and return parsed result or error."""
         try:
             if response.status_code >= 200 and response.status_code < 300:
-                json_data = response.json()
+                json_data = _json_loads(response.content)
                 if success_model:
                     return success_model(**json_data)
                 return json_data
             else:
                 # Try to parse as ErrorResponse
                 try:
-                    error_data = response.json()
+                    error_data = _json_loads(response.content)
                     return ErrorResponse(**error_data)
-                except:
+                except (ValueError, TypeError):
                     # Fallback error
                     return ErrorResponse(
                         error={
@@ -133,7 +173,7 @@ class KeyMasterAdminClient:
     
     def health_check(self) -> Union[Dict[str, Any], ErrorResponse]:
         """Check service health."""
-        response = self._make_request("GET", "/health")
+        response = self._make_request("GET", self._endpoints["health"])
         return self._handle_response(response)
     
     def create_project(self, project_id: str, label: str, owner: str) -> Union[Dict[str, Any], ErrorResponse]:
@@ -143,12 +183,12 @@ class KeyMasterAdminClient:
             "label": label,
             "owner": owner
         }
-        response = self._make_request("POST", "/v1/admin/create-project", params=params)
+        response = self._make_request("POST", self._endpoints["create_project"], params=params)
         return self._handle_response(response)
     
     def get_project(self, project_id: str) -> Union[Dict[str, Any], ErrorResponse]:
         """Get project information."""
-        response = self._make_request("GET", f"/v1/admin/project/{project_id}")
+        response = self._make_request("GET", self._admin_project_prefix + project_id)
         return self._handle_response(response)
     
     def mint_key(self, project_id: str, owner: str, metadata: str, expires_in_days: Optional[int] = None) -> Union[MintKeyResponse, ErrorResponse]:
@@ -157,20 +197,21 @@ class KeyMasterAdminClient:
         if expires_in_days is not None:
             expires_at = (datetime.now() + timedelta(days=expires_in_days)).timestamp()
         
-        request_data = MintKeyRequest(
-            project_id=project_id,
-            owner=owner,
-            metadata=metadata,
-            expires_at=expires_at
-        )
+        # Payload mirrors MintKeyRequest; built directly to skip a validate/dump round trip
+        payload = {
+            "project_id": project_id,
+            "owner": owner,
+            "metadata": metadata,
+            "expires_at": expires_at
+        }
         
-        response = self._make_request("POST", "/v1/mint-key", json=request_data.model_dump())
+        response = self._make_request("POST", self._endpoints["mint"], json=payload)
         return self._handle_response(response, MintKeyResponse)
     
     def revoke_key(self, project_id: str, key_id: str) -> Union[RevokeKeyResponse, ErrorResponse]:
         """Revoke an API key."""
-        request_data = RevokeKeyRequest(project_id=project_id, key_id=key_id)
-        response = self._make_request("POST", "/v1/revoke-key", json=request_data.model_dump())
+        payload = {"project_id": project_id, "key_id": key_id}
+        response = self._make_request("POST", self._endpoints["revoke"], json=payload)
         return self._handle_response(response, RevokeKeyResponse)
     
     def list_keys(self, project_id: str, offset: int = 0, limit: int = 50) -> Union[ListKeysResponse, ErrorResponse]:
@@ -180,7 +221,7 @@ class KeyMasterAdminClient:
             "offset": offset,
             "limit": limit
         }
-        response = self._make_request("GET", "/v1/list-keys", params=params)
+        response = self._make_request("GET", self._endpoints["list"], params=params)
         return self._handle_response(response, ListKeysResponse)
     
     def list_all_keys(self, project_id: str) -> Union[List[KeyMetadata], ErrorResponse]:
@@ -189,29 +230,65 @@ class KeyMasterAdminClient:
         offset = 0
         limit = 50
         
-        while True:
-            result = self.list_keys(project_id, offset, limit)
-            
-            if isinstance(result, ErrorResponse):
-                return result
-            
-            all_keys.extend(result.items)
-            
-            # Check if there are more results
-            if result.next is None or len(result.items) < limit:
-                break
+        # Page k+1's offset is known as soon as page k is requested, so keep
+        # one page in flight ahead of the one being consumed
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            current = executor.submit(self.list_keys, project_id, offset, limit)
+            prefetch = executor.submit(self.list_keys, project_id, offset + limit, limit)
             
-            offset += limit
+            while True:
+                result = current.result()
+                
+                if isinstance(result, ErrorResponse):
+                    prefetch.cancel()
+                    return result
+                
+                all_keys.extend(result.items)
+                
+                # The server cursor is authoritative; a short page may still have more
+                if result.next is None:
+                    prefetch.cancel()
+                    break
+                
+                next_offset = int(result.next)
+                if next_offset == offset + limit:
+                    current = prefetch
+                else:
+                    prefetch.cancel()
+                    current = executor.submit(self.list_keys, project_id, next_offset, limit)
+                
+                offset = next_offset
+                prefetch = executor.submit(self.list_keys, project_id, offset + limit, limit)
         
         return all_keys
 
 
-def parse_metadata(metadata_str: str) -> Union[str, Dict[str, Any]]:
-    """Parse metadata string as JSON if possible."""
+# First characters a JSON document can start with (including leading whitespace)
+_JSON_START_CHARS = frozenset('{["-0123456789tfn \t\r\n')
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_metadata_cached(metadata_str: str) -> Union[str, Dict[str, Any]]:
+    """Decode a metadata string once per distinct value."""
     try:
-        return json.loads(metadata_str)
-    except:
+        return _json_loads(metadata_str)
+    except json.JSONDecodeError:
+        return metadata_str
+
+
+def parse_metadata(metadata_str: str) -> Union[str, Dict[str, Any]]:
+    """
+    Parse metadata string as JSON if possible.
+    
+    Results are memoized per raw string, so keys sharing a metadata template
+    are decoded once. The returned dict is shared; copy it before mutating.
+    """
+    if not isinstance(metadata_str, str):
+        return metadata_str
+    # Plain labels cannot be JSON; skip the parser and its exception path
+    if not metadata_str or metadata_str[0] not in _JSON_START_CHARS:
         return metadata_str
+    return _parse_metadata_cached(metadata_str)
 
 
 # Example usage
@@ -221,16 +298,15 @@ if __name__ == "__main__":
     ADMIN_TOKEN = "Put your admin secret here"
     
     # Create client
-    client = KeyMasterAdminClient(BASE_URL, ADMIN_TOKEN)
-    
-    # Example: Create a project
-    result = client.create_project("test-project", "testlabel", "test@example.com")
-    print("Create project:", result)
-    
-    # Example: Mint a key
-    result = client.mint_key("test-project", "testuser", '{"mcp_server": "test-mcp-server"}')
-    print("Mint key:", result)
-    
-    # Example: List keys
-    result = client.list_all_keys("test-project")
-    print("List keys:", result)
+    with KeyMasterAdminClient(BASE_URL, ADMIN_TOKEN) as client:
+        # Example: Create a project
+        result = client.create_project("test-project", "testlabel", "test@example.com")
+        print("Create project:", result)
+        
+        # Example: Mint a key
+        result = client.mint_key("test-project", "testuser", '{"mcp_server": "test-mcp-server"}')
+        print("Mint key:", result)
+        
+        # Example: List keys
+        result = client.list_all_keys("test-project")
+        print("List keys:", result)
@@ -7,10 +7,21 @@ and parse the response using the Pydantic models from models.py.
 """
 
 import os
+import functools
 import json
 import sys
-from typing import Dict, Any, Union
+import time
+import hashlib
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Union
 import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:  # orjson is optional; fall back to the stdlib parser
+    _json_loads = json.loads
 
 from pydantic import BaseModel, Field
 
@@ -41,37 +52,91 @@ class ErrorDetail(BaseModel):
     message: str
 
 
+# ------------------------------------------------------------
+# Validation cache
+# ------------------------------------------------------------
+
+# Successful validations are cached in-process for a short TTL. Entries are
+# keyed by a digest of the API key so raw secrets are not held in the dict.
+CACHE_MAX_ENTRIES = int(os.getenv("KEYMASTER_CACHE_MAX_ENTRIES", "1024"))
+CACHE_TTL_SECONDS = float(os.getenv("KEYMASTER_CACHE_TTL_SECONDS", "60"))
+
+_VALIDATION_CACHE: "OrderedDict[bytes, tuple[float, ValidateKeyResponse]]" = OrderedDict()
+
+
+def _cache_key(api_key: str) -> bytes:
+    """Derive the cache key for an API key."""
+    return hashlib.blake2b(api_key.encode(), digest_size=16).digest()
 
-def validate_api_key(base_url: str, api_key: str) -> Union[ValidateKeyResponse, ErrorResponse]:
+
+def create_session(pool_maxsize: int = 20) -> requests.Session:
+    """
+    Create a pooled HTTP session for repeated validation calls.
+    
+    Args:
+        pool_maxsize: Maximum number of keep-alive connections per host
+        
+    Returns:
+        requests.Session with pooled adapters mounted
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=10, pool_maxsize=pool_maxsize)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def validate_api_key(
+    base_url: str,
+    api_key: str,
+    session: Optional[requests.Session] = None
+) -> Union[ValidateKeyResponse, ErrorResponse]:
     """
     Validate an API key against the KeyMaster service.
     
     Args:
         base_url: Base URL of the KeyMaster service (e.g., "http://localhost:8000")
         api_key: API key to validate
+        session: Optional pooled session to reuse connections across calls
         
     Returns:
         ValidateKeyResponse on success, ErrorResponse on error
+        
+    Successful responses are cached for CACHE_TTL_SECONDS; errors are never cached.
     """
+    cache_key = _cache_key(api_key)
+    cached = _VALIDATION_CACHE.get(cache_key)
+    if cached is not None:
+        if time.monotonic() - cached[0] < CACHE_TTL_SECONDS:
+            _VALIDATION_CACHE.move_to_end(cache_key)
+            return cached[1]
+        del _VALIDATION_CACHE[cache_key]
+    
     url = f"{base_url}/v1/validate-key"
     
-    # Create request payload
-    request_data = ValidateKeyRequest(api_key=api_key)
+    # Request payload mirrors ValidateKeyRequest
+    payload = {"api_key": api_key}
+    
+    http = session if session is not None else requests
     
     try:
-        response = requests.post(
+        response = http.post(
             url,
-            json=request_data.model_dump(),
+            json=payload,
             headers={"Content-Type": "application/json"},
             timeout=10
         )
         
         if response.status_code == 200:
-            # Success - parse as ValidateKeyResponse
-            return ValidateKeyResponse(**response.json())
+            # Success - parse as ValidateKeyResponse and cache it
+            result = ValidateKeyResponse(**_json_loads(response.content))
+            _VALIDATION_CACHE[cache_key] = (time.monotonic(), result)
+            if len(_VALIDATION_CACHE) > CACHE_MAX_ENTRIES:
+                _VALIDATION_CACHE.popitem(last=False)
+            return result
         else:
             # Error - parse as ErrorResponse
-            return ErrorResponse(**response.json())
+            return ErrorResponse(**_json_loads(response.content))
             
     except requests.exceptions.RequestException as e:
         # Network or connection error
@@ -91,20 +156,38 @@ def validate_api_key(base_url: str, api_key: str) -> Union[ValidateKeyResponse,
         )
 
 
+# First characters a JSON document can start with (including leading whitespace)
+_JSON_START_CHARS = frozenset('{["-0123456789tfn \t\r\n')
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_metadata_cached(metadata: str) -> Union[str, Dict[str, Any]]:
+    """Decode a metadata string once per distinct value."""
+    try:
+        return _json_loads(metadata)
+    except json.JSONDecodeError:
+        return metadata
+
+
 def parse_metadata(metadata: str) -> Union[str, Dict[str, Any]]:
     """
     Parse metadata string. If it's valid JSON, return as dict; otherwise return as string.
     
+    Results are memoized per raw string; the returned dict is shared between
+    calls, so copy it before mutating.
+    
     Args:
         metadata: Metadata string from the API response
         
     Returns:
         Dict if metadata is valid JSON, str otherwise
     """
-    try:
-        return json.loads(metadata)
-    except (json.JSONDecodeError, TypeError):
+    if not isinstance(metadata, str):
+        return metadata
+    # Plain labels cannot be JSON; skip the parser and its exception path
+    if not metadata or metadata[0] not in _JSON_START_CHARS:
         return metadata
+    return _parse_metadata_cached(metadata)
 
 
 
@@ -113,5 +196,6 @@ if __name__ == "__main__":
     TEST_KEY = "sk-proj.test-project.k_Aa0sSqD.-jUVLTdvZchjHk6dE0nlvYwx14ti_lu6"
     TEST_BAD_KEY = "sk-proj.fff-project.k_7xFAxjD.Wa2B8c5mvgcEkiDx1G8gSHUjjZBHCTyE"
 
-    print(f"Validating test key: {validate_api_key(BASE_URL, TEST_KEY)}")
-    print(f"Validating test bad key: {validate_api_key(BASE_URL, TEST_BAD_KEY)}")
+    with create_session() as session:
+        print(f"Validating test key: {validate_api_key(BASE_URL, TEST_KEY, session)}")
+        print(f"Validating test bad key: {validate_api_key(BASE_URL, TEST_BAD_KEY, session)}")
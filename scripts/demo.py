@@ -10,34 +10,35 @@ import time
 import json
 import requests
 import os
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
 
 BASE_URL = "http://localhost:8000"
 ADMIN_SECRET = os.getenv("ADMIN_SECRET", "demo_admin_secret_123")
 
+# Admin auth header, built once and merged per request (never mutated)
+ADMIN_HEADERS = {"Authorization": f"Bearer {ADMIN_SECRET}"}
+
+# Shared keep-alive pool, sized for the concurrent rate-limit burst
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_maxsize=32, pool_connections=4))
+SESSION.headers.update({"Content-Type": "application/json"})
+
 def log(message):
     """Log with timestamp."""
-    timestamp = datetime.now().strftime("%H:%M:%S.%f")[:-3]
+    now_ns = time.time_ns()
+    timestamp = f"{time.strftime('%H:%M:%S', time.localtime(now_ns // 1_000_000_000))}.{now_ns % 1_000_000_000 // 1_000_000:03d}"
     print(f"[{timestamp}] {message}")
 
 def make_request(method, endpoint, admin=False, **kwargs):
     """Make HTTP request and measure timing."""
-    start_time = time.time()
-    
-    # Add admin headers if needed
-    if admin:
-        headers = kwargs.get('headers', {})
-        headers['Authorization'] = f'Bearer {ADMIN_SECRET}'
-        kwargs['headers'] = headers
-    
-    if method.upper() == "GET":
-        response = requests.get(f"{BASE_URL}{endpoint}", **kwargs)
-    elif method.upper() == "POST":
-        response = requests.post(f"{BASE_URL}{endpoint}", **kwargs)
-    else:
-        raise ValueError(f"Unsupported method: {method}")
+    start_ns = time.perf_counter_ns()
+    
+    # Session merges per-request headers over its defaults without mutating either
+    headers = ADMIN_HEADERS if admin else None
+    response = SESSION.request(method, f"{BASE_URL}{endpoint}", headers=headers, **kwargs)
     
-    elapsed_ms = (time.time() - start_time) * 1000
+    elapsed_ms = (time.perf_counter_ns() - start_ns) / 1_000_000
     
     log(f"{method} {endpoint} -> {response.status_code} ({elapsed_ms:.1f}ms)")
     
@@ -99,10 +100,11 @@ def main():
     log("\n🔍 Testing API Key Validation")
     validation_times = []
     
+    # Encode the body once and reuse it for every sample on the keep-alive session
+    body = json.dumps({"api_key": api_key}).encode()
+    
     for i in range(5):
-        response, elapsed_ms = make_request("POST", "/v1/validate-key", json={
-            "api_key": api_key
-        })
+        response, elapsed_ms = make_request("POST", "/v1/validate-key", data=body)
         
         if response.status_code != 200:
             log(f"❌ Validation failed on attempt {i+1}")
@@ -145,19 +147,30 @@ def main():
     # Test rate limiting (Acceptance Criteria 4)
     log("\n⏱️  Testing Rate Limiting")
     rate_limit_hit = False
-    
-    for i in range(150):  # Exceed default rate limit
-        response, elapsed_ms = make_request("POST", "/v1/validate-key", json={
-            "api_key": api_key
-        })
+    success_count = 0
+    
+    # Rate limiting is driven by aggregate rate, so fire the probes concurrently
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        futures = [
+            executor.submit(SESSION.post, f"{BASE_URL}/v1/validate-key", json={"api_key": api_key}, timeout=5)
+            for _ in range(150)  # Exceed default rate limit
+        ]
         
-        if response.status_code == 401:
-            rate_limit_hit = True
-            log(f"✅ Rate limit hit after {i+1} requests")
-            break
-        elif response.status_code != 200:
-            log(f"❌ Unexpected error during rate limit test: {response.status_code}")
-            return False
+        for future in as_completed(futures):
+            response = future.result()
+            
+            if response.status_code == 401:
+                rate_limit_hit = True
+                log(f"✅ Rate limit hit after {success_count} successful requests")
+                break
+            elif response.status_code != 200:
+                log(f"❌ Unexpected error during rate limit test: {response.status_code}")
+                executor.shutdown(cancel_futures=True)
+                return False
+            
+            success_count += 1
+        
+        executor.shutdown(cancel_futures=True)
     
     if not rate_limit_hit:
         log("⚠️  Rate limit not hit within 150 requests")
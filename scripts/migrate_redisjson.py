@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Migrate RedisJSON storage to the MessagePack layout
+
+Older releases stored projects and API keys as RedisJSON documents, kept the
+disabled flag inside the key document and indexed project keys in a SET.
+This rewrites a database in place for the current layout:
+
+- project:{project_id} and apikey:{project_id}:{key_id} become MessagePack
+  strings read with GET
+- an API key's disabled flag moves to apimeta:{project_id}:{key_id}, so
+  revoked keys stay revoked
+- apiprojectkeys:{project_id} becomes a ZSET scored by created_at
+
+Run it once, with the RedisJSON module still loaded, before deploying the
+new release. Each key is converted in its own MULTI/EXEC and keys that are
+already migrated are skipped, so an interrupted run can simply be repeated.
+The json.* commands are no longer in the manager ACL, so connect as a user
+that can run them (e.g. the admin user).
+"""
+
+import argparse
+import json
+import os
+
+import msgpack
+import redis
+
+JSON_TYPE = "ReJSON-RL"
+
+
+def migrate_documents(client: redis.Redis, pattern: str, dry_run: bool) -> int:
+    """Convert the RedisJSON documents matching pattern to MessagePack strings."""
+    migrated = 0
+    for key in client.scan_iter(match=pattern, _type=JSON_TYPE, count=500):
+        doc = json.loads(client.execute_command("JSON.GET", key, "$"))[0]
+        disabled = doc.pop("disabled", False)
+
+        if not dry_run:
+            pipe = client.pipeline(transaction=True)
+            # SET replaces the JSON value regardless of its type
+            pipe.set(key, msgpack.packb(doc, use_bin_type=True))
+            if disabled:
+                # apikey:{project_id}:{key_id} -> apimeta:{project_id}:{key_id}
+                meta_key = b"apimeta:" + key.split(b":", 1)[1]
+                pipe.hset(meta_key, "disabled", 1)
+            pipe.execute()
+        migrated += 1
+    return migrated
+
+
+def migrate_indexes(client: redis.Redis, dry_run: bool) -> int:
+    """Rebuild SET project key indexes as ZSETs scored by created_at."""
+    migrated = 0
+    for key in client.scan_iter(match="apiprojectkeys:*", _type="set", count=500):
+        if dry_run:
+            migrated += 1
+            continue
+
+        project_id = key.split(b":", 1)[1]
+        key_ids = sorted(client.smembers(key))
+        docs = client.mget([b"apikey:" + project_id + b":" + key_id for key_id in key_ids]) if key_ids else []
+
+        # Index entries whose document is gone are dropped, as listing
+        # would skip them anyway
+        scores = {
+            key_id: msgpack.unpackb(raw, raw=False)["created_at"]
+            for key_id, raw in zip(key_ids, docs)
+            if raw is not None
+        }
+
+        temp_key = b"temp:" + key
+        pipe = client.pipeline(transaction=True)
+        pipe.delete(temp_key)
+        if scores:
+            pipe.zadd(temp_key, scores)
+            pipe.rename(temp_key, key)
+        else:
+            pipe.delete(key)
+        pipe.execute()
+        migrated += 1
+    return migrated
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default=os.getenv("REDIS_HOST", "localhost"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("REDIS_PORT", "6379")))
+    parser.add_argument("--db", type=int, default=int(os.getenv("REDIS_DB", "0")))
+    parser.add_argument("--username", default=os.getenv("REDIS_USERNAME"))
+    parser.add_argument("--password", default=os.getenv("REDIS_PASSWORD"))
+    parser.add_argument("--dry-run", action="store_true", help="count what would be migrated without writing")
+    args = parser.parse_args()
+
+    client = redis.Redis(
+        host=args.host,
+        port=args.port,
+        db=args.db,
+        username=args.username,
+        password=args.password
+    )
+
+    try:
+        # Documents first: the index rebuild reads created_at from the
+        # migrated key documents
+        projects = migrate_documents(client, "project:*", args.dry_run)
+        api_keys = migrate_documents(client, "apikey:*", args.dry_run)
+        indexes = migrate_indexes(client, args.dry_run)
+    finally:
+        client.close()
+
+    action = "Would migrate" if args.dry_run else "Migrated"
+    print(f"{action} {projects} projects, {api_keys} API keys and {indexes} key indexes")
+
+
+if __name__ == "__main__":
+    main()
@@ -20,6 +20,7 @@ generate_password() {
 REDIS_VALIDATOR_PASSWORD=$(generate_password)
 REDIS_MANAGER_PASSWORD=$(generate_password)
 ADMIN_SECRET=$(generate_password)
+API_KEY_PEPPER=$(generate_password)
 
 echo ""
 echo "✅ Generated secure passwords"
@@ -49,6 +50,9 @@ fi
 sed -i.tmp "s/REDIS_VALIDATOR_PASSWORD=.*/REDIS_VALIDATOR_PASSWORD=$REDIS_VALIDATOR_PASSWORD/" "$ENV_FILE"
 sed -i.tmp "s/REDIS_MANAGER_PASSWORD=.*/REDIS_MANAGER_PASSWORD=$REDIS_MANAGER_PASSWORD/" "$ENV_FILE"
 sed -i.tmp "s/ADMIN_SECRET=.*/ADMIN_SECRET=$ADMIN_SECRET/" "$ENV_FILE"
+if grep -q "API_KEY_PEPPER=CHANGE_ME" "$ENV_FILE"; then
+    sed -i.tmp "s/API_KEY_PEPPER=.*/API_KEY_PEPPER=$API_KEY_PEPPER/" "$ENV_FILE"
+fi
 rm "$ENV_FILE.tmp"
 
 echo "✅ Updated .env file with secure passwords"
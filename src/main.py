@@ -5,22 +5,28 @@ Provides key validation, minting, revocation, and listing endpoints
 for managing API keys with flexible metadata.
 """
 
+import asyncio
+import hmac
 import logging
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import asynccontextmanager
-from datetime import datetime
 from typing import Optional
+from urllib.parse import parse_qs
 
-from fastapi import FastAPI, HTTPException, status, Query, Header, Depends
+import orjson
+from cachetools import TTLCache
+from fastapi import FastAPI, HTTPException, Request, Response, status, Query, Header, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import HTMLResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
 from .models import (
     ValidateKeyRequest, ValidateKeyResponse,
     MintKeyRequest, MintKeyResponse,
     RevokeKeyRequest, RevokeKeyResponse,
-    ListKeysResponse, KeyMetadata,
+    ListKeysResponse,
     ErrorResponse, ErrorDetail,
     APIKeyDocument, ProjectDocument,
     ParsedAPIKey
@@ -31,7 +37,7 @@ from .security import generate_key_id, generate_secret, password_manager
 
 # Configure logging
 logging.basicConfig(
-    level=logging.INFO,
+    level=os.getenv("LOG_LEVEL", "info").upper(),
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
@@ -41,8 +47,16 @@ logger = logging.getLogger(__name__)
 redis_validator: Optional[RedisKeyManager] = None  # Read-only for /v1/validate-key
 redis_admin: Optional[RedisKeyManager] = None     # Read-write for admin operations
 
+# Recent successful validations, keyed by (project_id, key_id). The short TTL
+# bounds staleness for revocations made by other workers.
+validated_key_cache: TTLCache = TTLCache(
+    maxsize=int(os.getenv("VALIDATION_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("VALIDATION_CACHE_TTL", "5"))
+)
+
 # Admin authentication
 ADMIN_SECRET = os.getenv("ADMIN_SECRET")
+ADMIN_SECRET_BYTES = ADMIN_SECRET.encode() if ADMIN_SECRET else None
 security = HTTPBearer(auto_error=False)
 
 
@@ -54,13 +68,28 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting API Key Manager")
     
-    # Initialize Redis clients with different permissions
+    # Worker threads for legacy Argon2 verification (see validate_api_key)
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=min(os.cpu_count() or 1, 8))
+    )
+    
+    # Initialize Redis clients with different permissions. Each ACL user needs
+    # its own pool since pooled connections are authenticated per user.
+    pool_size = int(os.getenv("REDIS_POOL_SIZE", "50"))
+    
     redis_validator = RedisKeyManager(
         host=os.getenv("REDIS_HOST", "localhost"),
         port=int(os.getenv("REDIS_PORT", "6379")),
         password=os.getenv("REDIS_VALIDATOR_PASSWORD"),
         username=os.getenv("REDIS_VALIDATOR_USERNAME", "validator"),
-        db=int(os.getenv("REDIS_DB", "0"))
+        db=int(os.getenv("REDIS_DB", "0")),
+        max_connections=pool_size,
+        lookup_batch_window=float(os.getenv("VALIDATION_BATCH_WINDOW_MS", "1")) / 1000,
+        audit_stream_maxlen=int(os.getenv("AUDIT_STREAM_MAXLEN", "1000000")),
+        audit_retention=(
+            float(os.environ["AUDIT_RETENTION_SECONDS"])
+            if os.getenv("AUDIT_RETENTION_SECONDS") else None
+        )
     )
     
     redis_admin = RedisKeyManager(
@@ -68,30 +97,46 @@ async def lifespan(app: FastAPI):
         port=int(os.getenv("REDIS_PORT", "6379")),
         password=os.getenv("REDIS_MANAGER_PASSWORD"),
         username=os.getenv("REDIS_MANAGER_USERNAME", "manager"),
-        db=int(os.getenv("REDIS_DB", "0"))
+        db=int(os.getenv("REDIS_DB", "0")),
+        max_connections=pool_size
+    )
+    
+    # Test Redis connections concurrently
+    validator_ok, admin_ok = await asyncio.gather(
+        redis_validator.ping(), redis_admin.ping(), return_exceptions=True
     )
     
-    # Test Redis connections
-    if not redis_validator.ping():
+    if validator_ok is not True:
         logger.error("Failed to connect to Redis with validator credentials")
         raise RuntimeError("Redis validator connection failed")
     
-    if not redis_admin.ping():
+    if admin_ok is not True:
         logger.error("Failed to connect to Redis with admin credentials")
         raise RuntimeError("Redis admin connection failed")
     
     logger.info("Successfully connected to Redis with both validator and admin credentials")
     
+    await redis_validator.load_scripts()
+    
+    # Write validation audit events in the background so they stay off the
+    # request path
+    redis_validator.start_audit_writer(int(os.getenv("AUDIT_QUEUE_SIZE", "10000")))
+    
     # Check admin secret configuration
     if not ADMIN_SECRET:
         logger.warning("ADMIN_SECRET not set - admin endpoints will be disabled")
     else:
         logger.info("Admin authentication configured")
     
+    if not os.getenv("API_KEY_PEPPER"):
+        logger.warning("API_KEY_PEPPER not set - API key secrets are hashed without a pepper")
+    
     yield
     
     # Shutdown
     logger.info("Shutting down API Key Manager")
+    await redis_validator.close()
+    await redis_admin.close()
 
 
 # Create FastAPI application
@@ -102,9 +147,55 @@ app = FastAPI(
     lifespan=lifespan
 )
 
-# Add CORS middleware for development
+class SelectiveCORSMiddleware(CORSMiddleware):
+    """CORS middleware that passes exempt paths straight through to the app."""
+    
+    def __init__(self, app, exempt_paths=(), **kwargs):
+        super().__init__(app, **kwargs)
+        self.exempt_paths = frozenset(exempt_paths)
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"] in self.exempt_paths:
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
+class ProfilingMiddleware:
+    """Profile requests carrying ?profile=1 and return the pyinstrument HTML report."""
+    
+    def __init__(self, app):
+        # pyinstrument is a development dependency, so import it only when
+        # profiling is switched on
+        from pyinstrument import Profiler
+        
+        self.app = app
+        self.profiler_class = Profiler
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or "1" not in parse_qs(
+            scope["query_string"].decode("latin-1")
+        ).get("profile", ()):
+            await self.app(scope, receive, send)
+            return
+        
+        async def discard(message):
+            pass
+        
+        with self.profiler_class(async_mode="enabled") as profiler:
+            await self.app(scope, receive, discard)
+        await HTMLResponse(profiler.output_html())(scope, receive, send)
+
+
+# Profiling is for hot-spot hunting in development; never enable it in production
+if os.getenv("PROFILING_ENABLED") == "1":
+    app.add_middleware(ProfilingMiddleware)
+
+# Add CORS middleware for the admin UI. Key validation is called
+# server-to-server, never from a browser, so it skips CORS handling.
 app.add_middleware(
-    CORSMiddleware,
+    SelectiveCORSMiddleware,
+    exempt_paths=("/v1/validate-key",),
     allow_origins=["*"],  # Configure appropriately for production
     allow_credentials=True,
     allow_methods=["*"],
@@ -112,14 +203,47 @@ app.add_middleware(
 )
 
 
-def create_error_response(code: str, message: str, status_code: int = 400) -> JSONResponse:
-    """Create standardized error response."""
+def _error_body(code: str, message: str) -> bytes:
+    """Serialize an ErrorResponse body."""
     error_response = ErrorResponse(
         error=ErrorDetail(code=code, message=message)
     )
-    return JSONResponse(
-        status_code=status_code,
-        content=error_response.model_dump()
+    return orjson.dumps(error_response.model_dump())
+
+
+# Bodies for every fixed error this service returns, serialized at import
+_ERROR_BODIES = {
+    (code, message): _error_body(code, message)
+    for code, message in (
+        ("invalid_key", "Invalid or expired API key"),
+        ("internal_error", "Internal server error"),
+        ("storage_error", "Failed to store API key"),
+        ("storage_error", "Failed to create project"),
+        ("key_not_found", "API key not found"),
+        ("revocation_error", "Failed to revoke API key"),
+        ("project_exists", "Project already exists"),
+        ("project_not_found", "Project not found"),
+    )
+}
+_INVALID_KEY_BODY = _ERROR_BODIES[("invalid_key", "Invalid or expired API key")]
+
+
+def create_error_response(code: str, message: str, status_code: int = 400) -> Response:
+    """Create standardized error response."""
+    body = _ERROR_BODIES.get((code, message))
+    if body is None:
+        body = _error_body(code, message)
+    return Response(content=body, status_code=status_code, media_type="application/json")
+
+
+@app.exception_handler(Exception)
+async def unhandled_exception_handler(request: Request, exc: Exception) -> Response:
+    """Return the standard internal_error body for any unhandled exception."""
+    logger.error("Error in %s %s: %s", request.method, request.url.path, exc)
+    return create_error_response(
+        code="internal_error",
+        message="Internal server error",
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
     )
 
 
@@ -127,7 +251,9 @@ async def verify_admin_auth(credentials: Optional[HTTPAuthorizationCredentials]
     """
     Verify admin authentication using Bearer token.
     
-    The token should match the ADMIN_SECRET environment variable.
+    The token should match the ADMIN_SECRET environment variable. The
+    comparison is constant-time. Like every handler here this stays
+    async def so it runs on the event loop rather than the threadpool.
     """
     if not ADMIN_SECRET:
         raise HTTPException(
@@ -142,7 +268,7 @@ async def verify_admin_auth(credentials: Optional[HTTPAuthorizationCredentials]
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    if credentials.credentials != ADMIN_SECRET:
+    if not hmac.compare_digest(credentials.credentials.encode(), ADMIN_SECRET_BYTES):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid admin credentials",
@@ -153,16 +279,27 @@ async def verify_admin_auth(credentials: Optional[HTTPAuthorizationCredentials]
 
 
 
+# Health probes arrive frequently; reuse a recent successful Redis ping
+HEALTH_PING_INTERVAL = float(os.getenv("HEALTH_PING_INTERVAL", "1"))
+_HEALTHY_TEMPLATE = b'{"status":"healthy","timestamp":%.3f}'
+_last_healthy_ping = 0.0
+
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
-    if not redis_validator or not redis_validator.ping():
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="Redis connection failed"
-        )
+    global _last_healthy_ping
     
-    return {"status": "healthy", "timestamp": datetime.now().isoformat()}
+    now = time.time()
+    if now - _last_healthy_ping >= HEALTH_PING_INTERVAL:
+        if not redis_validator or not await redis_validator.ping():
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Redis connection failed"
+            )
+        _last_healthy_ping = now
+    
+    return Response(content=_HEALTHY_TEMPLATE % now, media_type="application/json")
 
 
 @app.post("/v1/validate-key", response_model=ValidateKeyResponse)
@@ -173,32 +310,24 @@ async def validate_key(request: ValidateKeyRequest):
     This is the primary endpoint for validating client API keys 
     and retrieving the associated metadata for routing or other purposes.
     """
-    try:
-        # Validate the API key (using read-only client)
-        api_key_doc = await redis_validator.validate_api_key(request.api_key)
-        
-        if api_key_doc is None:
-            return create_error_response(
-                code="invalid_key",
-                message="Invalid or expired API key",
-                status_code=status.HTTP_401_UNAUTHORIZED
-            )
-        
-        # Return success response
-        return ValidateKeyResponse(
-            project_id=api_key_doc.project_id,
-            key_id=api_key_doc.key_id,
-            owner=api_key_doc.owner,
-            metadata=api_key_doc.metadata
-        )
-        
-    except Exception as e:
-        logger.error(f"Error in validate_key: {e}")
-        return create_error_response(
-            code="internal_error",
-            message="Internal server error",
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
+    # Validate the API key (using read-only client)
+    api_key_doc = await redis_validator.validate_api_key(request.api_key, validated_key_cache)
+    
+    if api_key_doc is None:
+        return Response(
+            content=_INVALID_KEY_BODY,
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            media_type="application/json"
         )
+    
+    # A plain dict: FastAPI validates it against response_model and has
+    # Pydantic serialize it straight to JSON bytes
+    return {
+        "project_id": api_key_doc.project_id,
+        "key_id": api_key_doc.key_id,
+        "owner": api_key_doc.owner,
+        "metadata": api_key_doc.metadata
+    }
 
 
 @app.post("/v1/mint-key", response_model=MintKeyResponse)
@@ -208,52 +337,43 @@ async def mint_key(request: MintKeyRequest, _: bool = Depends(verify_admin_auth)
     
     Creates a new API key for the specified project with the given parameters.
     """
-    try:
-        # Generate new key components
-        key_id = generate_key_id()
-        secret = generate_secret()
-        secret_hash = password_manager.hash_password(secret)
-        
-        # Create API key document
-        current_time = datetime.now().timestamp()
-        api_key_doc = APIKeyDocument(
-            key_id=key_id,
-            project_id=request.project_id,
-            owner=request.owner,
-            metadata=request.metadata,
-            secret_hash=secret_hash,
-            disabled=False,
-            created_at=current_time,
-            expires_at=request.expires_at
-        )
-        
-        # Store in Redis (using admin client)
-        if not await redis_admin.store_api_key(api_key_doc):
-            return create_error_response(
-                code="storage_error",
-                message="Failed to store API key",
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
-        
-        # Format the API key for return
-        parsed_key = ParsedAPIKey(
-            project_id=request.project_id,
-            key_id=key_id,
-            secret=secret
-        )
-        api_key = parsed_key.format_key()
-        
-        logger.info(f"Minted new API key for project {request.project_id}, key {key_id}")
-        
-        return MintKeyResponse(api_key=api_key)
-        
-    except Exception as e:
-        logger.error(f"Error in mint_key: {e}")
+    # Generate new key components
+    key_id = generate_key_id()
+    secret = generate_secret()
+    secret_hash = password_manager.hash_token(secret)
+    
+    # Create API key document
+    current_time = time.time()
+    api_key_doc = APIKeyDocument(
+        key_id=key_id,
+        project_id=request.project_id,
+        owner=request.owner,
+        metadata=request.metadata,
+        secret_hash=secret_hash,
+        disabled=False,
+        created_at=current_time,
+        expires_at=request.expires_at
+    )
+    
+    # Store in Redis (using admin client)
+    if not await redis_admin.store_api_key(api_key_doc):
         return create_error_response(
-            code="internal_error",
-            message="Internal server error",
+            code="storage_error",
+            message="Failed to store API key",
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
+    
+    # Format the API key for return
+    parsed_key = ParsedAPIKey(
+        project_id=request.project_id,
+        key_id=key_id,
+        secret=secret
+    )
+    api_key = parsed_key.format_key()
+    
+    logger.info("Minted new API key for project %s, key %s", request.project_id, key_id)
+    
+    return MintKeyResponse(api_key=api_key)
 
 
 @app.post("/v1/revoke-key", response_model=RevokeKeyResponse)
@@ -263,35 +383,28 @@ async def revoke_key(request: RevokeKeyRequest, _: bool = Depends(verify_admin_a
     
     Disables the specified API key to prevent future use.
     """
-    try:
-        # Check if key exists
-        api_key_doc = await redis_admin.get_api_key(request.project_id, request.key_id)
-        if api_key_doc is None:
-            return create_error_response(
-                code="key_not_found",
-                message="API key not found",
-                status_code=status.HTTP_404_NOT_FOUND
-            )
-        
-        # Revoke the key (using admin client)
-        if not await redis_admin.revoke_api_key(request.project_id, request.key_id):
-            return create_error_response(
-                code="revocation_error",
-                message="Failed to revoke API key",
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
-        
-        logger.info(f"Revoked API key for project {request.project_id}, key {request.key_id}")
-        
-        return RevokeKeyResponse(revoked=True)
-        
-    except Exception as e:
-        logger.error(f"Error in revoke_key: {e}")
+    # Check existence and revoke in one round trip (using admin client)
+    revoked = await redis_admin.revoke_if_exists(request.project_id, request.key_id)
+    if revoked is None:
         return create_error_response(
-            code="internal_error",
-            message="Internal server error",
+            code="key_not_found",
+            message="API key not found",
+            status_code=status.HTTP_404_NOT_FOUND
+        )
+    
+    if not revoked:
+        return create_error_response(
+            code="revocation_error",
+            message="Failed to revoke API key",
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
+    
+    # Drop any cached validation so the key is rejected immediately
+    validated_key_cache.pop((request.project_id, request.key_id), None)
+    
+    logger.info("Revoked API key for project %s, key %s", request.project_id, request.key_id)
+    
+    return RevokeKeyResponse(revoked=True)
 
 
 @app.get("/v1/list-keys", response_model=ListKeysResponse)
@@ -306,39 +419,30 @@ async def list_keys(
     
     Returns metadata for all API keys belonging to the specified project.
     """
-    try:
-        # Retrieve API keys for the project
-        api_key_docs = await redis_admin.list_project_keys(project_id, offset, limit)
-        
-        # Convert to metadata format (without secrets)
-        items = []
-        for doc in api_key_docs:
-            key_metadata = KeyMetadata(
-                key_id=doc.key_id,
-                owner=doc.owner,
-                metadata=doc.metadata,
-                created_at=doc.created_at,
-                disabled=doc.disabled,
-                expires_at=doc.expires_at
-            )
-            items.append(key_metadata)
-        
-        # Determine if there are more results for pagination
-        next_token = None
-        if len(items) == limit:
-            # There might be more results
-            next_offset = offset + limit
-            next_token = str(next_offset)
-        
-        return ListKeysResponse(items=items, next=next_token)
-        
-    except Exception as e:
-        logger.error(f"Error in list_keys: {e}")
-        return create_error_response(
-            code="internal_error",
-            message="Internal server error",
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
-        )
+    # Retrieve API keys for the project
+    api_key_docs = await redis_admin.list_project_keys(project_id, offset, limit)
+    
+    # Convert to KeyMetadata shape (without secrets)
+    items = [
+        {
+            "key_id": doc.key_id,
+            "owner": doc.owner,
+            "metadata": doc.metadata,
+            "created_at": doc.created_at,
+            "disabled": doc.disabled,
+            "expires_at": doc.expires_at
+        }
+        for doc in api_key_docs
+    ]
+    
+    # Determine if there are more results for pagination
+    next_token = None
+    if len(items) == limit:
+        # There might be more results
+        next_offset = offset + limit
+        next_token = str(next_offset)
+    
+    return {"items": items, "next": next_token}
 
 
 # Additional utility endpoints for admin
@@ -355,44 +459,34 @@ async def create_project(
     
     Creates a new project that can contain API keys.
     """
-    try:
-        # Check if project already exists (using admin client)
-        existing_project = await redis_admin.get_project(project_id)
-        if existing_project:
-            return create_error_response(
-                code="project_exists",
-                message="Project already exists",
-                status_code=status.HTTP_409_CONFLICT
-            )
-        
-        # Create project document
-        current_time = datetime.now().timestamp()
-        project_doc = ProjectDocument(
-            project_id=project_id,
-            label=label,
-            owner=owner,
-            created_at=current_time
+    # Create project document
+    current_time = time.time()
+    project_doc = ProjectDocument(
+        project_id=project_id,
+        label=label,
+        owner=owner,
+        created_at=current_time
+    )
+    
+    # Create only if absent, atomically (using admin client)
+    created = await redis_admin.create_project_if_absent(project_doc)
+    if created is None:
+        return create_error_response(
+            code="project_exists",
+            message="Project already exists",
+            status_code=status.HTTP_409_CONFLICT
         )
-        
-        # Store in Redis (using admin client)
-        if not await redis_admin.store_project(project_doc):
-            return create_error_response(
-                code="storage_error",
-                message="Failed to create project",
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
-        
-        logger.info(f"Created project {project_id}")
-        
-        return {"project_id": project_id, "created": True}
-        
-    except Exception as e:
-        logger.error(f"Error in create_project: {e}")
+    
+    if not created:
         return create_error_response(
-            code="internal_error",
-            message="Internal server error",
+            code="storage_error",
+            message="Failed to create project",
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
+    
+    logger.info("Created project %s", project_id)
+    
+    return {"project_id": project_id, "created": True}
 
 
 @app.get("/v1/admin/project/{project_id}")
@@ -400,33 +494,38 @@ async def get_project(project_id: str, _: bool = Depends(verify_admin_auth)):
     """
     Get project information (admin operation).
     """
-    try:
-        project_doc = await redis_admin.get_project(project_id)
-        if project_doc is None:
-            return create_error_response(
-                code="project_not_found",
-                message="Project not found",
-                status_code=status.HTTP_404_NOT_FOUND
-            )
-        
-        return project_doc.model_dump()
-        
-    except Exception as e:
-        logger.error(f"Error in get_project: {e}")
+    project_doc = await redis_admin.get_project(project_id)
+    if project_doc is None:
         return create_error_response(
-            code="internal_error",
-            message="Internal server error",
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
+            code="project_not_found",
+            message="Project not found",
+            status_code=status.HTTP_404_NOT_FOUND
         )
+    
+    return project_doc.model_dump()
 
 
 if __name__ == "__main__":
     import uvicorn
     
-    uvicorn.run(
-        "src.main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True,
-        log_level="info"
-    )
+    if os.getenv("RELOAD") == "1":
+        uvicorn.run(
+            "src.main:app",
+            host="0.0.0.0",
+            port=8000,
+            reload=True,
+            log_level="info"
+        )
+    else:
+        # Each worker is a separate process with its own Redis pools and
+        # validation cache; size REDIS_POOL_SIZE per worker
+        uvicorn.run(
+            "src.main:app",
+            host="0.0.0.0",
+            port=8000,
+            workers=int(os.getenv("WEB_CONCURRENCY", str(os.cpu_count() or 1))),
+            loop="uvloop",
+            http="httptools",
+            access_log=False,
+            log_level="warning"
+        )
@@ -1,19 +1,19 @@
 """
 Pydantic models for the API Key Manager.
 
-Defines data models for API requests/responses and Redis JSON documents
-for managing API keys and their associated metadata.
+Defines data models for API requests/responses and the MessagePack-encoded
+Redis documents for managing API keys and their associated metadata.
 """
 
-from datetime import datetime
+import time
 from typing import Optional, List
 from pydantic import BaseModel, Field, ConfigDict
 
+from ._fastpath import is_valid_doc, parse_api_key
 
-class ErrorResponse(BaseModel):
-    """Standard error response model."""
-    error: "ErrorDetail"
 
+# ErrorDetail comes first so ErrorResponse needs no forward reference; an
+# unresolved one leaves the validator to be built on first use
 
 class ErrorDetail(BaseModel):
     """Error detail information."""
@@ -21,10 +21,17 @@ class ErrorDetail(BaseModel):
     message: str
 
 
+class ErrorResponse(BaseModel):
+    """Standard error response model."""
+    error: ErrorDetail
+
+
 # Request/Response Models for API endpoints
 
 class ValidateKeyRequest(BaseModel):
     """Request model for POST /v1/validate-key"""
+    model_config = ConfigDict(frozen=True)
+    
     api_key: str = Field(..., description="API key in format sk-proj.{project_id}.{key_id}.{secret}")
 
 
@@ -38,6 +45,8 @@ class ValidateKeyResponse(BaseModel):
 
 class MintKeyRequest(BaseModel):
     """Request model for POST /v1/mint-key (admin)"""
+    model_config = ConfigDict(frozen=True)
+    
     project_id: str = Field(..., description="Project identifier")
     owner: str = Field(..., description="Key owner name")
     metadata: str = Field(..., description="Flexible metadata (can be server name, JSON, or any string)")
@@ -51,6 +60,8 @@ class MintKeyResponse(BaseModel):
 
 class RevokeKeyRequest(BaseModel):
     """Request model for POST /v1/revoke-key (admin)"""
+    model_config = ConfigDict(frozen=True)
+    
     project_id: str = Field(..., description="Project identifier")
     key_id: str = Field(..., description="Key identifier to revoke")
 
@@ -76,11 +87,11 @@ class ListKeysResponse(BaseModel):
     next: Optional[str] = None  # For pagination
 
 
-# Redis JSON Document Models
+# Redis Document Models (stored MessagePack-encoded)
 
 class ProjectDocument(BaseModel):
-    """Redis JSON document model for project:{project_id}"""
-    model_config = ConfigDict(extra="forbid")
+    """Redis document model for project:{project_id} (MessagePack string)"""
+    model_config = ConfigDict(extra="forbid", frozen=True)
     
     project_id: str
     label: str
@@ -89,14 +100,16 @@ class ProjectDocument(BaseModel):
 
 
 class APIKeyDocument(BaseModel):
-    """Redis JSON document model for apikey:{project_id}:{key_id}"""
-    model_config = ConfigDict(extra="forbid")
+    """Redis document model for apikey:{project_id}:{key_id} (MessagePack string)"""
+    # Frozen: stored documents are shared through in-process caches
+    model_config = ConfigDict(extra="forbid", frozen=True)
     
     key_id: str
     project_id: str
     owner: str
     metadata: str
     secret_hash: str
+    # Stored in the apimeta:{project_id}:{key_id} hash, not the document
     disabled: bool = False
     created_at: float
     expires_at: Optional[float] = None
@@ -105,18 +118,20 @@ class APIKeyDocument(BaseModel):
         """Check if the key is expired."""
         if self.expires_at is None:
             return False
-        return datetime.now().timestamp() > self.expires_at
+        return time.time() > self.expires_at
     
     def is_valid(self) -> bool:
         """Check if the key is valid (not disabled and not expired)."""
-        return not self.disabled and not self.is_expired()
+        return is_valid_doc(self.disabled, self.expires_at, time.time())
 
 
 # Audit event for Redis Streams
 
 class AuditEvent(BaseModel):
     """Audit event model for Redis Stream audit:keylookup"""
-    ts: float = Field(default_factory=lambda: datetime.now().timestamp())
+    model_config = ConfigDict(frozen=True)
+    
+    ts: float = Field(default_factory=time.time)
     project_id: str
     key_id: str
     result: str  # "ok", "denied", "rate_limited"
@@ -125,7 +140,8 @@ class AuditEvent(BaseModel):
     def to_stream_fields(self) -> dict:
         """Convert to Redis Stream field format."""
         return {
-            "ts": str(self.ts),
+            # Millisecond precision; fixed-point formatting is cheaper than repr
+            "ts": f"{self.ts:.3f}",
             "project_id": self.project_id,
             "key_id": self.key_id,
             "result": self.result,
@@ -135,27 +151,37 @@ class AuditEvent(BaseModel):
 
 # Internal models
 
+class _ParsedKey:
+    """Lightweight parsed API key used on the validation hot path."""
+    __slots__ = ("project_id", "key_id", "secret")
+    
+    def __init__(self, project_id: str, key_id: str, secret: str):
+        self.project_id = project_id
+        self.key_id = key_id
+        self.secret = secret
+    
+    def format_key(self) -> str:
+        """Format back to API key string"""
+        return f"sk-proj.{self.project_id}.{self.key_id}.{self.secret}"
+
+
 class ParsedAPIKey(BaseModel):
     """Parsed API key components"""
+    model_config = ConfigDict(frozen=True)
+    
     project_id: str
     key_id: str
     secret: str
     
-    @classmethod
-    def parse(cls, api_key: str) -> "ParsedAPIKey":
-        """Parse API key format: sk-proj.{project_id}.{key_id}.{secret}"""
-        if not api_key.startswith("sk-proj."):
-            raise ValueError("Invalid API key format")
-        
-        parts = api_key.split(".", 3)
-        if len(parts) != 4:
-            raise ValueError("Invalid API key format")
+    @staticmethod
+    def parse(api_key: str) -> _ParsedKey:
+        """
+        Parse API key format: sk-proj.{project_id}.{key_id}.{secret}
         
-        return cls(
-            project_id=parts[1],
-            key_id=parts[2],
-            secret=parts[3]
-        )
+        Returns a slots-based _ParsedKey rather than a model instance so
+        validation requests skip Pydantic construction.
+        """
+        return _ParsedKey(*parse_api_key(api_key))
     
     def format_key(self) -> str:
         """Format back to API key string"""
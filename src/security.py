@@ -1,28 +1,77 @@
 """
 Security utilities for the API Key Manager.
 
-Provides password hashing using Argon2id and other security functions.
+Provides password hashing using Argon2id, peppered HMAC-SHA256 hashing for
+server-generated API key secrets, and other security functions.
 """
 
+import hmac
+import os
 import secrets
 import string
+import threading
+from typing import Optional
 from argon2 import PasswordHasher
-from argon2.exceptions import VerifyMismatchError
+from cachetools import TTLCache
+from argon2.exceptions import InvalidHashError, VerificationError
+
+from ._fastpath import hmac_token_hex, verify_hmac_token
+
+
+# Prefix of hashes produced by hash_password (legacy API key rows)
+ARGON2_HASH_PREFIX = "$argon2"
+
+# Alphabet for generated key IDs
+_KEY_ID_ALPHABET = (string.ascii_letters + string.digits).encode()
+# Largest multiple of len(_KEY_ID_ALPHABET) below 256, for rejection sampling
+_KEY_ID_BYTE_LIMIT = 256 - 256 % len(_KEY_ID_ALPHABET)
 
 
 class PasswordManager:
     """Manages password hashing and verification using Argon2id."""
     
-    def __init__(self):
-        # Using Argon2id with secure defaults
-        # These parameters provide good security while maintaining reasonable performance
-        self.hasher = PasswordHasher(
-            time_cost=3,      # 3 iterations
-            memory_cost=65536,  # 64 MB
-            parallelism=1,    # 1 thread
-            hash_len=32,      # 32 byte hash
-            salt_len=16,      # 16 byte salt
+    def __init__(self, pepper: Optional[str] = None):
+        """
+        Initialize the password manager.
+        
+        Args:
+            pepper: Server-side HMAC key for API key secrets. Defaults to the
+                API_KEY_PEPPER environment variable.
+        """
+        if pepper is None:
+            pepper = os.getenv("API_KEY_PEPPER", "")
+        self.pepper = pepper.encode()
+        
+        if os.getenv("ARGON2_FAST", "0") == "1":
+            # Cheap Argon2id parameters for test suites only - never production
+            self.hasher = PasswordHasher(
+                time_cost=1,
+                memory_cost=8 * 1024,  # 8 MB
+                parallelism=1,
+                hash_len=16,
+                salt_len=16,
+            )
+        else:
+            # Using Argon2id with secure defaults
+            # These parameters provide good security while maintaining reasonable performance
+            self.hasher = PasswordHasher(
+                time_cost=3,      # 3 iterations
+                memory_cost=65536,  # 64 MB
+                parallelism=1,    # 1 thread
+                hash_len=32,      # 32 byte hash
+                salt_len=16,      # 16 byte salt
+            )
+        
+        # HMAC tags (under a per-process key, so no plaintext is retained) of
+        # passwords that passed Argon2, keyed by hash. A hash only matches one
+        # password, so a known tag settles later attempts either way without
+        # Argon2. The TTL bounds how long an entry outlives a rotated hash.
+        self._verify_cache_key = secrets.token_bytes(32)
+        self._verify_cache: TTLCache = TTLCache(
+            maxsize=int(os.getenv("ARGON2_VERIFY_CACHE_SIZE", "10000")),
+            ttl=float(os.getenv("ARGON2_VERIFY_CACHE_TTL", "300"))
         )
+        self._verify_cache_lock = threading.Lock()
     
     def hash_password(self, password: str) -> str:
         """
@@ -40,6 +89,9 @@ class PasswordManager:
         """
         Verify a password against its hash.
         
+        Once a hash has been verified, later attempts against it are checked
+        with a constant-time HMAC comparison instead of Argon2.
+        
         Args:
             password: Plain text password to verify
             hash_str: Argon2id hash to verify against
@@ -47,11 +99,53 @@ class PasswordManager:
         Returns:
             True if password matches, False otherwise
         """
+        tag = hmac_token_hex(self._verify_cache_key, password)
+        with self._verify_cache_lock:
+            known_tag = self._verify_cache.get(hash_str)
+        if known_tag is not None:
+            return hmac.compare_digest(tag, known_tag)
+        
         try:
             self.hasher.verify(hash_str, password)
-            return True
-        except VerifyMismatchError:
+        except (VerificationError, InvalidHashError):
             return False
+        
+        with self._verify_cache_lock:
+            self._verify_cache[hash_str] = tag
+        return True
+    
+    def hash_token(self, token: str) -> str:
+        """
+        Hash a server-generated API key secret using HMAC-SHA256.
+        
+        Secrets are high-entropy random tokens, so a keyed fast hash is
+        sufficient and avoids Argon2's per-verify cost on the validation path.
+        
+        Args:
+            token: Plain text secret to hash
+            
+        Returns:
+            Hex-encoded HMAC-SHA256 digest
+        """
+        return hmac_token_hex(self.pepper, token)
+    
+    def verify_token(self, token: str, hash_str: str) -> bool:
+        """
+        Verify an API key secret against its stored hash.
+        
+        Hashes starting with the Argon2 prefix are legacy rows and are checked
+        with verify_password; everything else is compared as an HMAC digest.
+        
+        Args:
+            token: Plain text secret to verify
+            hash_str: Stored hash to verify against
+            
+        Returns:
+            True if the secret matches, False otherwise
+        """
+        if hash_str.startswith(ARGON2_HASH_PREFIX):
+            return self.verify_password(token, hash_str)
+        return verify_hmac_token(self.pepper, token, hash_str)
 
 
 def generate_key_id() -> str:
@@ -61,10 +155,16 @@ def generate_key_id() -> str:
     Returns:
         Random alphanumeric key ID (e.g., "k_2J6Hqk3")
     """
-    # Generate 7 random alphanumeric characters
-    chars = string.ascii_letters + string.digits
-    random_part = ''.join(secrets.choice(chars) for _ in range(7))
-    return f"k_{random_part}"
+    # Generate 7 random alphanumeric characters, drawing entropy in bulk and
+    # rejecting bytes that would bias the 62-symbol alphabet
+    random_part = bytearray()
+    while len(random_part) < 7:
+        for b in secrets.token_bytes(14):
+            if b < _KEY_ID_BYTE_LIMIT:
+                random_part.append(_KEY_ID_ALPHABET[b % len(_KEY_ID_ALPHABET)])
+                if len(random_part) == 7:
+                    break
+    return f"k_{random_part.decode()}"
 
 
 def generate_secret(length: int = 32) -> str:
@@ -77,9 +177,9 @@ def generate_secret(length: int = 32) -> str:
     Returns:
         Random secret string
     """
-    # Use URL-safe base64 characters for the secret
-    chars = string.ascii_letters + string.digits + '-_'
-    return ''.join(secrets.choice(chars) for _ in range(length))
+    # URL-safe base64 carries 6 random bits per character; draw enough bytes
+    # to cover length characters and trim the excess
+    return secrets.token_urlsafe((length * 3 + 3) // 4)[:length]
 
 
 # Global password manager instance
@@ -2,14 +2,20 @@
 Pytest configuration and fixtures for API Key Manager tests.
 """
 
+import os
+
+# Use cheap Argon2id parameters and a known admin secret; both must be set
+# before src.security and src.main are imported
+os.environ.setdefault("ARGON2_FAST", "1")
+os.environ.setdefault("ADMIN_SECRET", "test_admin_secret")
+
 import pytest
-import asyncio
-from datetime import datetime
-from typing import Generator, AsyncGenerator
+import time
+from typing import Awaitable, Callable, Dict, AsyncGenerator, List
 
-import redis.asyncio as redis
+import fakeredis
 from fastapi.testclient import TestClient
-from httpx import AsyncClient
+from httpx import ASGITransport, AsyncClient
 
 from src.main import app
 from src.redis_client import RedisKeyManager
@@ -17,60 +23,55 @@ from src.models import APIKeyDocument, ProjectDocument
 from src.security import password_manager
 
 
-@pytest.fixture(scope="session")
-def event_loop() -> Generator[asyncio.AbstractEventLoop, None, None]:
-    """Create an instance of the default event loop for the test session."""
-    loop = asyncio.get_event_loop_policy().new_event_loop()
-    yield loop
-    loop.close()
-
-
 @pytest.fixture(scope="session")
 async def redis_client() -> AsyncGenerator[RedisKeyManager, None]:
-    """Create a Redis client for testing."""
-    # Use a test database
-    client = RedisKeyManager(
-        host="localhost",
-        port=6379,
-        password="defaultpass",
-        db=15  # Use database 15 for testing
-    )
-    
-    # Test connection
-    if not client.ping():
-        pytest.skip("Redis is not available for testing")
+    """Create a Redis key manager backed by an in-memory fake Redis."""
+    fake = fakeredis.FakeAsyncRedis(protocol=3)
+    client = RedisKeyManager(client=fake)
     
     yield client
     
-    # Cleanup - flush test database
-    client.client.flushdb()
+    await client.close()
+    await fake.aclose()
 
 
 @pytest.fixture
 async def clean_redis(redis_client: RedisKeyManager) -> AsyncGenerator[RedisKeyManager, None]:
     """Provide a clean Redis database for each test."""
-    # Clean before test
-    redis_client.client.flushdb()
+    # Reset once, before the test; every test that touches Redis goes through
+    # this fixture, so leftovers are always cleared before they can be seen
+    await redis_client.client.flushdb(asynchronous=True)
+    redis_client.clear_doc_caches()
     
     yield redis_client
-    
-    # Clean after test
-    redis_client.client.flushdb()
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def client() -> TestClient:
-    """Create a test client for the FastAPI app."""
-    return TestClient(app)
+    """Create one test client for the FastAPI app, shared by the session."""
+    return TestClient(app, headers={"Authorization": f"Bearer {os.environ['ADMIN_SECRET']}"})
 
 
 @pytest.fixture
 async def async_client() -> AsyncGenerator[AsyncClient, None]:
-    """Create an async test client for the FastAPI app."""
-    async with AsyncClient(app=app, base_url="http://test") as ac:
+    """Create an async test client that runs the app in the test's event loop."""
+    async with AsyncClient(
+        transport=ASGITransport(app=app),
+        base_url="http://test",
+        headers={"Authorization": f"Bearer {os.environ['ADMIN_SECRET']}"}
+    ) as ac:
         yield ac
 
 
+@pytest.fixture(scope="session")
+def secret_hashes() -> Dict[str, str]:
+    """Hash the fixture secrets once per session."""
+    return {
+        secret: password_manager.hash_password(secret)
+        for secret in ("test_secret_123", "expired_secret_123", "disabled_secret_123")
+    }
+
+
 @pytest.fixture
 async def sample_project(clean_redis: RedisKeyManager) -> ProjectDocument:
     """Create a sample project for testing."""
@@ -78,7 +79,7 @@ async def sample_project(clean_redis: RedisKeyManager) -> ProjectDocument:
         project_id="test_project",
         label="Test Project",
         owner="Test Owner",
-        created_at=datetime.now().timestamp()
+        created_at=time.time()
     )
     
     await clean_redis.store_project(project_doc)
@@ -86,10 +87,12 @@ async def sample_project(clean_redis: RedisKeyManager) -> ProjectDocument:
 
 
 @pytest.fixture
-async def sample_api_key(clean_redis: RedisKeyManager, sample_project: ProjectDocument) -> APIKeyDocument:
+async def sample_api_key(
+    clean_redis: RedisKeyManager, sample_project: ProjectDocument, secret_hashes: Dict[str, str]
+) -> APIKeyDocument:
     """Create a sample API key for testing."""
     secret = "test_secret_123"
-    secret_hash = password_manager.hash_password(secret)
+    secret_hash = secret_hashes[secret]
     
     api_key_doc = APIKeyDocument(
         key_id="k_test123",
@@ -98,26 +101,53 @@ async def sample_api_key(clean_redis: RedisKeyManager, sample_project: ProjectDo
         metadata="test-server",
         secret_hash=secret_hash,
         disabled=False,
-        created_at=datetime.now().timestamp(),
+        created_at=time.time(),
         expires_at=None
     )
     
     await clean_redis.store_api_key(api_key_doc)
     
-    # Store the plain secret for testing
-    api_key_doc.plain_secret = secret
-    
-    return api_key_doc
+    # Return a copy carrying the plain secret for testing
+    return api_key_doc.model_copy(update={"plain_secret": secret})
 
 
 @pytest.fixture
-async def expired_api_key(clean_redis: RedisKeyManager, sample_project: ProjectDocument) -> APIKeyDocument:
+def seed_keys(
+    clean_redis: RedisKeyManager, secret_hashes: Dict[str, str]
+) -> Callable[[str, int], Awaitable[List[APIKeyDocument]]]:
+    """Return a helper that stores n keys for a project directly in Redis."""
+    async def seed(project_id: str, n: int) -> List[APIKeyDocument]:
+        created_at = time.time()
+        docs = [
+            APIKeyDocument(
+                key_id=f"k_seed{i}",
+                project_id=project_id,
+                owner=f"User {i}",
+                metadata=f"server-{i}",
+                secret_hash=secret_hashes["test_secret_123"],
+                disabled=False,
+                created_at=created_at + i,
+                expires_at=None
+            )
+            for i in range(n)
+        ]
+        for doc in docs:
+            await clean_redis.store_api_key(doc)
+        return docs
+    
+    return seed
+
+
+@pytest.fixture
+async def expired_api_key(
+    clean_redis: RedisKeyManager, sample_project: ProjectDocument, secret_hashes: Dict[str, str]
+) -> APIKeyDocument:
     """Create an expired API key for testing."""
     secret = "expired_secret_123"
-    secret_hash = password_manager.hash_password(secret)
+    secret_hash = secret_hashes[secret]
     
     # Set expiry to 1 hour ago
-    expired_time = datetime.now().timestamp() - 3600
+    expired_time = time.time() - 3600
     
     api_key_doc = APIKeyDocument(
         key_id="k_expired",
@@ -126,23 +156,23 @@ async def expired_api_key(clean_redis: RedisKeyManager, sample_project: ProjectD
         metadata="test-server",
         secret_hash=secret_hash,
         disabled=False,
-        created_at=datetime.now().timestamp() - 7200,  # Created 2 hours ago
+        created_at=time.time() - 7200,  # Created 2 hours ago
         expires_at=expired_time
     )
     
     await clean_redis.store_api_key(api_key_doc)
     
-    # Store the plain secret for testing
-    api_key_doc.plain_secret = secret
-    
-    return api_key_doc
+    # Return a copy carrying the plain secret for testing
+    return api_key_doc.model_copy(update={"plain_secret": secret})
 
 
 @pytest.fixture
-async def disabled_api_key(clean_redis: RedisKeyManager, sample_project: ProjectDocument) -> APIKeyDocument:
+async def disabled_api_key(
+    clean_redis: RedisKeyManager, sample_project: ProjectDocument, secret_hashes: Dict[str, str]
+) -> APIKeyDocument:
     """Create a disabled API key for testing."""
     secret = "disabled_secret_123"
-    secret_hash = password_manager.hash_password(secret)
+    secret_hash = secret_hashes[secret]
     
     api_key_doc = APIKeyDocument(
         key_id="k_disabled",
@@ -151,13 +181,11 @@ async def disabled_api_key(clean_redis: RedisKeyManager, sample_project: Project
         metadata="test-server",
         secret_hash=secret_hash,
         disabled=True,  # Disabled
-        created_at=datetime.now().timestamp(),
+        created_at=time.time(),
         expires_at=None
     )
     
     await clean_redis.store_api_key(api_key_doc)
     
-    # Store the plain secret for testing
-    api_key_doc.plain_secret = secret
-    
-    return api_key_doc
+    # Return a copy carrying the plain secret for testing
+    return api_key_doc.model_copy(update={"plain_secret": secret})
@@ -2,16 +2,24 @@
 Tests for Pydantic models.
 """
 
+import inspect
+import time
+
 import pytest
-from datetime import datetime
-from pydantic import ValidationError
+from pydantic import BaseModel, ValidationError
 
+from src import models
 from src.models import (
     APIKeyDocument, ProjectDocument, AuditEvent, ParsedAPIKey,
     ValidateKeyRequest, MintKeyRequest, RevokeKeyRequest
 )
 
 
+# Fixed expiries that no test run can reach (year 3000) or precede (epoch)
+FAR_FUTURE = 32503680000.0
+PAST = 0.0
+
+
 class TestAPIKeyDocument:
     """Test APIKeyDocument model."""
     
@@ -21,10 +29,10 @@ class TestAPIKeyDocument:
             key_id="k_test123",
             project_id="test_project",
             owner="Test User",
-            server_name="test-server",
+            metadata="test-server",
             secret_hash="argon2id$...",
             disabled=False,
-            created_at=datetime.now().timestamp(),
+            created_at=time.time(),
             expires_at=None
         )
         
@@ -35,16 +43,16 @@ class TestAPIKeyDocument:
     
     def test_api_key_document_with_expiry(self):
         """Test API key document with expiry time."""
-        future_time = datetime.now().timestamp() + 3600  # 1 hour from now
+        future_time = time.time() + 3600  # 1 hour from now
         
         doc = APIKeyDocument(
             key_id="k_test123",
             project_id="test_project",
             owner="Test User",
-            server_name="test-server",
+            metadata="test-server",
             secret_hash="argon2id$...",
             disabled=False,
-            created_at=datetime.now().timestamp(),
+            created_at=time.time(),
             expires_at=future_time
         )
         
@@ -54,17 +62,15 @@ class TestAPIKeyDocument:
     
     def test_expired_api_key(self):
         """Test expired API key detection."""
-        past_time = datetime.now().timestamp() - 3600  # 1 hour ago
-        
         doc = APIKeyDocument(
             key_id="k_test123",
             project_id="test_project",
             owner="Test User",
-            server_name="test-server",
+            metadata="test-server",
             secret_hash="argon2id$...",
             disabled=False,
-            created_at=datetime.now().timestamp(),
-            expires_at=past_time
+            created_at=time.time(),
+            expires_at=PAST
         )
         
         assert doc.is_expired()
@@ -76,10 +82,10 @@ class TestAPIKeyDocument:
             key_id="k_test123",
             project_id="test_project",
             owner="Test User",
-            server_name="test-server",
+            metadata="test-server",
             secret_hash="argon2id$...",
             disabled=True,
-            created_at=datetime.now().timestamp(),
+            created_at=time.time(),
             expires_at=None
         )
         
@@ -92,10 +98,10 @@ class TestAPIKeyDocument:
                 key_id="k_test123",
                 project_id="test_project",
                 owner="Test User",
-                server_name="test-server",
+                metadata="test-server",
                 secret_hash="argon2id$...",
                 disabled=False,
-                created_at=datetime.now().timestamp(),
+                created_at=time.time(),
                 expires_at=None,
                 extra_field="not_allowed"  # This should fail
             )
@@ -110,7 +116,7 @@ class TestProjectDocument:
             project_id="test_project",
             label="Test Project",
             owner="Test Owner",
-            created_at=datetime.now().timestamp()
+            created_at=time.time()
         )
         
         assert doc.project_id == "test_project"
@@ -124,7 +130,7 @@ class TestProjectDocument:
                 project_id="test_project",
                 label="Test Project",
                 owner="Test Owner",
-                created_at=datetime.now().timestamp(),
+                created_at=time.time(),
                 extra_field="not_allowed"  # This should fail
             )
 
@@ -141,7 +147,20 @@ class TestParsedAPIKey:
         assert parsed.project_id == "test_project"
         assert parsed.key_id == "k_abc123"
         assert parsed.secret == "secret_xyz"
-    
+
+    def test_api_key_secret_with_dots(self):
+        """Test that dots after the key ID remain part of the secret."""
+        parsed = ParsedAPIKey.parse("sk-proj.test_project.k_abc123.sec.ret")
+
+        assert parsed.key_id == "k_abc123"
+        assert parsed.secret == "sec.ret"
+
+    def test_parse_returns_fresh_result(self):
+        """Test that parsed keys, and the secrets they hold, are not cached."""
+        api_key = "sk-proj.test_project.k_abc123.secret_fresh"
+
+        assert ParsedAPIKey.parse(api_key) is not ParsedAPIKey.parse(api_key)
+
     def test_format_api_key(self):
         """Test formatting API key back to string."""
         parsed = ParsedAPIKey(
@@ -160,6 +179,25 @@ class TestParsedAPIKey:
         with pytest.raises(ValueError, match="Invalid API key format"):
             ParsedAPIKey.parse(api_key)
     
+    def test_invalid_api_key_empty_parts(self):
+        """Test that empty project IDs, key IDs and secrets are rejected."""
+        for api_key in (
+            "sk-proj..k_abc123.secret_xyz",
+            "sk-proj.test_project..secret_xyz",
+            "sk-proj.test_project.k_abc123.",
+        ):
+            with pytest.raises(ValueError, match="Invalid API key format"):
+                ParsedAPIKey.parse(api_key)
+    
+    def test_invalid_api_key_non_ascii(self):
+        """Test that keys with characters Redis could not be sent are rejected."""
+        for api_key in (
+            "sk-proj.test_project\udc80.k_abc123.secret_xyz",
+            "sk-proj.test_project.k_abc123.sécret",
+        ):
+            with pytest.raises(ValueError, match="Invalid API key format"):
+                ParsedAPIKey.parse(api_key)
+    
     def test_invalid_api_key_parts(self):
         """Test parsing API key with wrong number of parts."""
         api_key = "sk-proj.test_project.k_abc123"  # Missing secret
@@ -219,27 +257,25 @@ class TestRequestModels:
         request = MintKeyRequest(
             project_id="test_project",
             owner="Test User",
-            server_name="test-server",
+            metadata="test-server",
             expires_at=None
         )
         
         assert request.project_id == "test_project"
         assert request.owner == "Test User"
-        assert request.server_name == "test-server"
+        assert request.metadata == "test-server"
         assert request.expires_at is None
     
     def test_mint_key_request_with_expiry(self):
         """Test MintKeyRequest model with expiry."""
-        future_time = datetime.now().timestamp() + 3600
-        
         request = MintKeyRequest(
             project_id="test_project",
             owner="Test User",
-            server_name="test-server",
-            expires_at=future_time
+            metadata="test-server",
+            expires_at=FAR_FUTURE
         )
         
-        assert request.expires_at == future_time
+        assert request.expires_at == FAR_FUTURE
     
     def test_revoke_key_request(self):
         """Test RevokeKeyRequest model."""
@@ -250,3 +286,17 @@ class TestRequestModels:
         
         assert request.project_id == "test_project"
         assert request.key_id == "k_abc123"
+
+
+class TestModelBuild:
+    """Test that models are ready to use straight after import."""
+    
+    def test_all_models_built_at_import(self):
+        """Unresolved forward references defer validator builds to the first request."""
+        incomplete = [
+            name
+            for name, cls in inspect.getmembers(models, inspect.isclass)
+            if issubclass(cls, BaseModel) and cls is not BaseModel
+            and not cls.__pydantic_complete__
+        ]
+        assert incomplete == []
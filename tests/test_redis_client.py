@@ -2,10 +2,16 @@
 Tests for Redis client operations.
 """
 
+import asyncio
+import re
+import time
+from pathlib import Path
+
 import pytest
-from datetime import datetime
 
-from src.redis_client import RedisKeyManager
+import fakeredis
+
+from src.redis_client import ADMIT_SCRIPT, USAGE_SCRIPT, RedisKeyManager
 from src.models import APIKeyDocument, ProjectDocument, AuditEvent, ParsedAPIKey
 from src.security import password_manager
 
@@ -17,16 +23,16 @@ class TestRedisKeyManager:
     async def test_store_and_get_api_key(self, clean_redis: RedisKeyManager, sample_project: ProjectDocument):
         """Test storing and retrieving API key."""
         secret = "test_secret_123"
-        secret_hash = password_manager.hash_password(secret)
+        secret_hash = password_manager.hash_token(secret)
         
         api_key_doc = APIKeyDocument(
             key_id="k_test123",
             project_id=sample_project.project_id,
             owner="Test User",
-            server_name="test-server",
+            metadata="test-server",
             secret_hash=secret_hash,
             disabled=False,
-            created_at=datetime.now().timestamp(),
+            created_at=time.time(),
             expires_at=None
         )
         
@@ -40,7 +46,7 @@ class TestRedisKeyManager:
         assert retrieved.key_id == "k_test123"
         assert retrieved.project_id == sample_project.project_id
         assert retrieved.owner == "Test User"
-        assert retrieved.server_name == "test-server"
+        assert retrieved.metadata == "test-server"
         assert retrieved.disabled is False
     
     @pytest.mark.asyncio
@@ -48,7 +54,84 @@ class TestRedisKeyManager:
         """Test retrieving non-existent API key."""
         retrieved = await clean_redis.get_api_key("nonexistent", "k_nonexistent")
         assert retrieved is None
-    
+
+    @pytest.mark.asyncio
+    async def test_get_api_key_for_validation(self, clean_redis: RedisKeyManager, sample_api_key: APIKeyDocument):
+        """Test that the validation lookup returns the fields validation needs."""
+        retrieved = await clean_redis.get_api_key_for_validation(
+            sample_api_key.project_id, sample_api_key.key_id
+        )
+        assert retrieved is not None
+        assert retrieved.key_id == sample_api_key.key_id
+        assert retrieved.project_id == sample_api_key.project_id
+        assert retrieved.secret_hash == sample_api_key.secret_hash
+        assert retrieved.metadata == sample_api_key.metadata
+        assert retrieved.is_valid()
+
+        missing = await clean_redis.get_api_key_for_validation("nonexistent", "k_nonexistent")
+        assert missing is None
+
+    @pytest.mark.asyncio
+    async def test_concurrent_validation_lookups_are_batched(self, clean_redis: RedisKeyManager, sample_api_key: APIKeyDocument):
+        """Test that concurrent lookups, including duplicates, each get their own result."""
+        found, duplicate, missing = await asyncio.gather(
+            clean_redis.get_api_key_for_validation(sample_api_key.project_id, sample_api_key.key_id),
+            clean_redis.get_api_key_for_validation(sample_api_key.project_id, sample_api_key.key_id),
+            clean_redis.get_api_key_for_validation(sample_api_key.project_id, "k_nonexistent"),
+        )
+
+        assert found is not None and found.key_id == sample_api_key.key_id
+        assert duplicate is not None and duplicate.key_id == sample_api_key.key_id
+        assert missing is None
+
+    @pytest.mark.asyncio
+    async def test_batched_lookup_errors_stay_per_lookup(self, clean_redis: RedisKeyManager, sample_api_key: APIKeyDocument):
+        """Test that a lookup failing in Redis doesn't fail the others in its batch."""
+        # GET inside the lookup script fails with WRONGTYPE on a list
+        await clean_redis.client.rpush(clean_redis._apikey_key("test_project", "k_wrongtype"), "x")
+        
+        found, failed = await asyncio.gather(
+            clean_redis.get_api_key_for_validation(sample_api_key.project_id, sample_api_key.key_id),
+            clean_redis.get_api_key_for_validation("test_project", "k_wrongtype"),
+        )
+        
+        assert found is not None and found.key_id == sample_api_key.key_id
+        assert failed is None
+
+    @pytest.mark.asyncio
+    async def test_batched_lookup_rejects_unencodable_keys_alone(self, clean_redis: RedisKeyManager, sample_api_key: APIKeyDocument):
+        """Test that a key that cannot be encoded fails only its own lookup."""
+        batcher = clean_redis._lookup_batcher
+        found, failed = await asyncio.gather(
+            batcher.get(
+                clean_redis._apikey_key(sample_api_key.project_id, sample_api_key.key_id),
+                clean_redis._apimeta_key(sample_api_key.project_id, sample_api_key.key_id)
+            ),
+            batcher.get("apikey:test_project\udc80:k_bad", "apimeta:test_project\udc80:k_bad"),
+            return_exceptions=True
+        )
+        
+        assert found is not None and not isinstance(found, Exception)
+        assert isinstance(failed, UnicodeEncodeError)
+
+    @pytest.mark.asyncio
+    async def test_batched_lookup_cancelled_flush_releases_waiters(self, clean_redis: RedisKeyManager, sample_api_key: APIKeyDocument):
+        """Test that cancelling a batch cancels its waiters and later lookups still run."""
+        batcher = clean_redis._lookup_batcher
+        waiter = asyncio.ensure_future(
+            clean_redis.get_api_key_for_validation(sample_api_key.project_id, sample_api_key.key_id)
+        )
+        await asyncio.sleep(0)
+        batcher.task.cancel()
+        
+        await asyncio.wait([waiter], timeout=1)
+        assert waiter.cancelled()
+        
+        found = await asyncio.wait_for(
+            clean_redis.get_api_key_for_validation(sample_api_key.project_id, sample_api_key.key_id), 1
+        )
+        assert found is not None
+
     @pytest.mark.asyncio
     async def test_revoke_api_key(self, clean_redis: RedisKeyManager, sample_api_key: APIKeyDocument):
         """Test revoking an API key."""
@@ -61,12 +144,62 @@ class TestRedisKeyManager:
         assert retrieved is not None
         assert retrieved.disabled is True
     
+    @pytest.mark.asyncio
+    async def test_get_api_key_is_cached_until_revoked(self, clean_redis: RedisKeyManager):
+        """Test that repeat reads are served from cache and revocation invalidates it."""
+        api_key_doc = APIKeyDocument(
+            key_id="k_cached",
+            project_id="test_project",
+            owner="Test User",
+            metadata="test-server",
+            secret_hash=password_manager.hash_token("cached_secret"),
+            created_at=time.time()
+        )
+        await clean_redis.store_api_key(api_key_doc)
+        
+        first = await clean_redis.get_api_key("test_project", "k_cached")
+        assert await clean_redis.get_api_key("test_project", "k_cached") is first
+        
+        await clean_redis.revoke_api_key("test_project", "k_cached")
+        
+        retrieved = await clean_redis.get_api_key("test_project", "k_cached")
+        assert retrieved is not first
+        assert retrieved.disabled is True
+    
     @pytest.mark.asyncio
     async def test_revoke_nonexistent_api_key(self, clean_redis: RedisKeyManager):
         """Test revoking non-existent API key."""
         success = await clean_redis.revoke_api_key("nonexistent", "k_nonexistent")
         assert success is False
     
+    @pytest.mark.asyncio
+    async def test_revoke_if_exists(self, clean_redis: RedisKeyManager, sample_api_key: APIKeyDocument):
+        """Test single round-trip revocation of an existing key."""
+        revoked = await clean_redis.revoke_if_exists(sample_api_key.project_id, sample_api_key.key_id)
+        assert revoked is True
+        
+        retrieved = await clean_redis.get_api_key(sample_api_key.project_id, sample_api_key.key_id)
+        assert retrieved.disabled is True
+    
+    @pytest.mark.asyncio
+    async def test_revoke_if_exists_missing(self, clean_redis: RedisKeyManager):
+        """Test single round-trip revocation of a missing key."""
+        revoked = await clean_redis.revoke_if_exists("nonexistent", "k_nonexistent")
+        assert revoked is None
+    
+    @pytest.mark.asyncio
+    async def test_create_project_if_absent(self, clean_redis: RedisKeyManager):
+        """Test atomic project creation."""
+        project_doc = ProjectDocument(
+            project_id="test_project_nx",
+            label="Test Project NX",
+            owner="Test Owner",
+            created_at=time.time()
+        )
+        
+        assert await clean_redis.create_project_if_absent(project_doc) is True
+        assert await clean_redis.create_project_if_absent(project_doc) is None
+    
     @pytest.mark.asyncio
     async def test_store_and_get_project(self, clean_redis: RedisKeyManager):
         """Test storing and retrieving project."""
@@ -74,7 +207,7 @@ class TestRedisKeyManager:
             project_id="test_project_2",
             label="Test Project 2",
             owner="Test Owner 2",
-            created_at=datetime.now().timestamp()
+            created_at=time.time()
         )
         
         # Store project
@@ -97,20 +230,22 @@ class TestRedisKeyManager:
     @pytest.mark.asyncio
     async def test_list_project_keys(self, clean_redis: RedisKeyManager, sample_project: ProjectDocument):
         """Test listing API keys for a project."""
-        # Create multiple API keys
-        for i in range(3):
-            secret_hash = password_manager.hash_password(f"secret_{i}")
-            api_key_doc = APIKeyDocument(
+        # Create multiple API keys, storing them concurrently
+        now = time.time()
+        docs = [
+            APIKeyDocument(
                 key_id=f"k_test{i}",
                 project_id=sample_project.project_id,
                 owner=f"User {i}",
-                server_name=f"server-{i}",
-                secret_hash=secret_hash,
+                metadata=f"server-{i}",
+                secret_hash=password_manager.hash_token(f"secret_{i}"),
                 disabled=False,
-                created_at=datetime.now().timestamp(),
+                created_at=now,
                 expires_at=None
             )
-            await clean_redis.store_api_key(api_key_doc)
+            for i in range(3)
+        ]
+        await asyncio.gather(*(clean_redis.store_api_key(doc) for doc in docs))
         
         # List keys
         keys = await clean_redis.list_project_keys(sample_project.project_id)
@@ -123,20 +258,22 @@ class TestRedisKeyManager:
     @pytest.mark.asyncio
     async def test_list_project_keys_pagination(self, clean_redis: RedisKeyManager, sample_project: ProjectDocument):
         """Test listing API keys with pagination."""
-        # Create 5 API keys
-        for i in range(5):
-            secret_hash = password_manager.hash_password(f"secret_{i}")
-            api_key_doc = APIKeyDocument(
+        # Create 5 API keys, storing them concurrently
+        now = time.time()
+        docs = [
+            APIKeyDocument(
                 key_id=f"k_page{i}",
                 project_id=sample_project.project_id,
                 owner=f"User {i}",
-                server_name=f"server-{i}",
-                secret_hash=secret_hash,
+                metadata=f"server-{i}",
+                secret_hash=password_manager.hash_token(f"secret_{i}"),
                 disabled=False,
-                created_at=datetime.now().timestamp(),
+                created_at=now,
                 expires_at=None
             )
-            await clean_redis.store_api_key(api_key_doc)
+            for i in range(5)
+        ]
+        await asyncio.gather(*(clean_redis.store_api_key(doc) for doc in docs))
         
         # Get first page
         keys_page1 = await clean_redis.list_project_keys(sample_project.project_id, offset=0, limit=3)
@@ -150,7 +287,16 @@ class TestRedisKeyManager:
         page1_ids = {key.key_id for key in keys_page1}
         page2_ids = {key.key_id for key in keys_page2}
         assert page1_ids.isdisjoint(page2_ids)
-    
+
+    @pytest.mark.asyncio
+    async def test_list_project_keys_skips_stale_index(self, clean_redis: RedisKeyManager, sample_api_key: APIKeyDocument):
+        """Test that index entries without a stored document are skipped."""
+        project_keys = clean_redis._apiprojectkeys_key(sample_api_key.project_id)
+        await clean_redis.client.zadd(project_keys, {"k_missing": 0})
+
+        keys = await clean_redis.list_project_keys(sample_api_key.project_id)
+        assert [key.key_id for key in keys] == [sample_api_key.key_id]
+
     @pytest.mark.asyncio
     async def test_log_audit_event(self, clean_redis: RedisKeyManager):
         """Test logging audit events."""
@@ -164,18 +310,101 @@ class TestRedisKeyManager:
         assert success is True
         
         # Verify event was stored in stream
-        stream_entries = clean_redis.client.xread(streams={"audit:keylookup": "0"})
-        assert len(stream_entries) == 1
-        
-        stream_name, entries = stream_entries[0]
-        assert stream_name == "audit:keylookup"
+        entries = await clean_redis.client.xrange("audit:keylookup")
         assert len(entries) == 1
         
         entry_id, fields = entries[0]
-        assert fields["project_id"] == "test_project"
-        assert fields["key_id"] == "k_test123"
-        assert fields["result"] == "ok"
-    
+        assert fields[b"project_id"] == b"test_project"
+        assert fields[b"key_id"] == b"k_test123"
+        assert fields[b"result"] == b"ok"
+
+    @pytest.mark.asyncio
+    async def test_log_audit_event_with_retention(self, clean_redis: RedisKeyManager, monkeypatch):
+        """Test that a retention period trims the audit stream by age instead of length."""
+        monkeypatch.setattr(clean_redis, "audit_retention", 60.0)
+        
+        trim = clean_redis._audit_trim()
+        assert "maxlen" not in trim
+        assert abs(trim["minid"] - (time.time() - 60) * 1000) < 5000
+        
+        event = AuditEvent(project_id="test_project", key_id="k_test123", result="ok")
+        assert await clean_redis.log_audit_event(event) is True
+        assert await clean_redis.client.xlen("audit:keylookup") == 1
+
+    @pytest.mark.asyncio
+    async def test_audit_writer_flushes_queued_events(self, clean_redis: RedisKeyManager, sample_api_key: APIKeyDocument):
+        """Test that queued audit events are written when the writer stops."""
+        parsed_key = ParsedAPIKey(
+            project_id=sample_api_key.project_id,
+            key_id=sample_api_key.key_id,
+            secret=sample_api_key.plain_secret
+        )
+
+        clean_redis.start_audit_writer(max_queue_size=10)
+        try:
+            result = await clean_redis.validate_api_key(parsed_key.format_key())
+            assert result is not None
+        finally:
+            await clean_redis.stop_audit_writer()
+
+        entries = await clean_redis.client.xrange("audit:keylookup")
+        assert len(entries) == 1
+        assert entries[0][1][b"result"] == b"ok"
+
+    @pytest.mark.asyncio
+    async def test_audit_writer_writes_in_batches(self, clean_redis: RedisKeyManager):
+        """Test that every queued event is written when it spans several batches."""
+        clean_redis.start_audit_writer(max_queue_size=100, batch_size=4)
+        try:
+            for i in range(10):
+                await clean_redis._audit("test_project", f"k_{i}", "ok")
+        finally:
+            await clean_redis.stop_audit_writer()
+
+        assert await clean_redis.client.xlen("audit:keylookup") == 10
+        assert clean_redis.audit_dropped == 0
+
+    @pytest.mark.asyncio
+    async def test_audit_writer_skips_unencodable_events(self, clean_redis: RedisKeyManager):
+        """Test that an event that cannot be encoded does not stop later events being written."""
+        dropped = clean_redis.audit_dropped
+        clean_redis.start_audit_writer(max_queue_size=100, batch_size=4)
+        try:
+            await clean_redis._audit("test_project\udc80", "k_bad", "not_found")
+            for i in range(5):
+                await clean_redis._audit("test_project", f"k_{i}", "ok")
+        finally:
+            await clean_redis.stop_audit_writer()
+
+        assert await clean_redis.client.xlen("audit:keylookup") == 5
+        assert clean_redis.audit_dropped == dropped + 1
+
+    @pytest.mark.asyncio
+    async def test_audit_writer_survives_failed_batch(self, clean_redis: RedisKeyManager, monkeypatch):
+        """Test that an unexpected error in one batch does not end the writer."""
+        log_audit_events = clean_redis.log_audit_events
+        calls = 0
+
+        async def fail_once(events):
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                raise RuntimeError("boom")
+            return await log_audit_events(events)
+
+        monkeypatch.setattr(clean_redis, "log_audit_events", fail_once)
+        dropped = clean_redis.audit_dropped
+        clean_redis.start_audit_writer(max_queue_size=100, batch_size=1)
+        try:
+            for i in range(3):
+                await clean_redis._audit("test_project", f"k_{i}", "ok")
+                await asyncio.wait_for(clean_redis.audit_queue.join(), 1)
+        finally:
+            await clean_redis.stop_audit_writer()
+
+        assert await clean_redis.client.xlen("audit:keylookup") == 2
+        assert clean_redis.audit_dropped == dropped + 1
+
     @pytest.mark.asyncio
     async def test_check_rate_limit_allowed(self, clean_redis: RedisKeyManager):
         """Test rate limiting - requests within limit."""
@@ -202,24 +431,112 @@ class TestRedisKeyManager:
         # Next request should be rate limited
         allowed = await clean_redis.check_rate_limit(project_id, key_id, limit_per_minute=limit)
         assert allowed is False
-    
+
+    @pytest.mark.asyncio
+    async def test_check_rate_limit_concurrent(self, clean_redis: RedisKeyManager):
+        """Test that concurrent checks never admit more than the limit."""
+        limit = 10
+        
+        results = await asyncio.gather(*(
+            clean_redis.check_rate_limit("test_project", "k_test123", limit_per_minute=limit)
+            for _ in range(limit * 3)
+        ))
+        
+        assert results.count(True) == limit
+
+    @pytest.mark.asyncio
+    async def test_scripts_reload_once_after_flush(self, clean_redis: RedisKeyManager, monkeypatch):
+        """Test that concurrent NOSCRIPT failures share a single SCRIPT LOAD."""
+        await clean_redis.client.script_flush()
+        
+        loads = []
+        script_load = clean_redis.client.script_load
+        
+        async def counting_script_load(script):
+            loads.append(script)
+            return await script_load(script)
+        
+        monkeypatch.setattr(clean_redis.client, "script_load", counting_script_load)
+        
+        results = await asyncio.gather(*(
+            clean_redis.check_rate_limit("test_project", "k_test123") for _ in range(10)
+        ))
+        
+        assert results == [True] * 10
+        assert len(loads) == 1
+
+    @pytest.mark.asyncio
+    async def test_check_rate_limit_weights_previous_minute(
+        self, clean_redis: RedisKeyManager, monkeypatch
+    ):
+        """Test that last minute's requests count in proportion to the window overlap."""
+        project_id = "test_project"
+        key_id = "k_test123"
+        
+        # 15 seconds into the minute the previous minute still covers 3/4 of
+        # the window, so 8 earlier requests count as 6 against a limit of 10
+        minute = 28_000_000
+        monkeypatch.setattr("src.redis_client.time.time", lambda: minute * 60 + 15.0)
+        previous_key = clean_redis._ratelimit_key(project_id, key_id, minute - 1)
+        await clean_redis.client.set(previous_key, 8)
+        
+        results = [
+            await clean_redis.check_rate_limit(project_id, key_id, limit_per_minute=10)
+            for _ in range(5)
+        ]
+        assert results == [True, True, True, True, False]
+
+    @pytest.mark.asyncio
+    async def test_check_rate_limit_sets_window_ttl(self, clean_redis: RedisKeyManager):
+        """Test that the rate limit counter always expires."""
+        project_id = "test_project"
+        key_id = "k_test123"
+        
+        await clean_redis.check_rate_limit(project_id, key_id)
+        
+        current_minute = int(time.time() // 60)
+        rate_key = clean_redis._ratelimit_key(project_id, key_id, current_minute)
+        assert 0 < await clean_redis.client.ttl(rate_key) <= 120
+
+    @pytest.mark.asyncio
+    async def test_admit_request_counts_only_allowed_usage(self, clean_redis: RedisKeyManager):
+        """Test that admit_request rate limits and records usage for allowed requests only."""
+        project_id = "test_project"
+        key_id = "k_test123"
+        limit = 2
+
+        results = [
+            await clean_redis.admit_request(project_id, key_id, limit_per_minute=limit)
+            for _ in range(limit + 1)
+        ]
+        assert results == [True, True, False]
+
+        meta_key = clean_redis._apimeta_key(project_id, key_id)
+        assert int(await clean_redis.client.hget(meta_key, "usage_count")) == limit
+        
+        # last_used_ms is stamped from the Redis server clock in epoch millis
+        last_used_ms = int(await clean_redis.client.hget(meta_key, "last_used_ms"))
+        assert abs(last_used_ms - time.time() * 1000) < 5000
+
     @pytest.mark.asyncio
     async def test_update_key_usage(self, clean_redis: RedisKeyManager):
         """Test updating key usage metadata."""
         project_id = "test_project"
         key_id = "k_test123"
         
-        # Update usage multiple times
-        for i in range(3):
-            await clean_redis.update_key_usage(project_id, key_id)
+        # Update usage multiple times concurrently
+        await asyncio.gather(*(
+            clean_redis.update_key_usage(project_id, key_id) for _ in range(3)
+        ))
         
         # Check usage count
         meta_key = clean_redis._apimeta_key(project_id, key_id)
-        usage_count = clean_redis.client.hget(meta_key, "usage_count")
-        last_used = clean_redis.client.hget(meta_key, "last_used")
+        usage_count = await clean_redis.client.hget(meta_key, "usage_count")
+        last_used_ms = await clean_redis.client.hget(meta_key, "last_used_ms")
         
         assert int(usage_count) == 3
-        assert last_used is not None  # Should have a timestamp
+        # Stamped from the Redis server clock, like admit_request
+        assert abs(int(last_used_ms) - time.time() * 1000) < 5000
     
     @pytest.mark.asyncio
     async def test_validate_api_key_success(self, clean_redis: RedisKeyManager, sample_api_key: APIKeyDocument):
@@ -240,12 +557,11 @@ class TestRedisKeyManager:
         assert result.project_id == sample_api_key.project_id
         
         # Check audit log
-        stream_entries = clean_redis.client.xread(streams={"audit:keylookup": "0"})
-        assert len(stream_entries) == 1
+        entries = await clean_redis.client.xrange("audit:keylookup")
+        assert len(entries) == 1
         
-        stream_name, entries = stream_entries[0]
         entry_id, fields = entries[0]
-        assert fields["result"] == "ok"
+        assert fields[b"result"] == b"ok"
     
     @pytest.mark.asyncio
     async def test_validate_api_key_wrong_secret(self, clean_redis: RedisKeyManager, sample_api_key: APIKeyDocument):
@@ -264,12 +580,11 @@ class TestRedisKeyManager:
         assert result is None
         
         # Check audit log shows denial
-        stream_entries = clean_redis.client.xread(streams={"audit:keylookup": "0"})
-        assert len(stream_entries) == 1
+        entries = await clean_redis.client.xrange("audit:keylookup")
+        assert len(entries) == 1
         
-        stream_name, entries = stream_entries[0]
         entry_id, fields = entries[0]
-        assert fields["result"] == "denied"
+        assert fields[b"result"] == b"denied"
     
     @pytest.mark.asyncio
     async def test_validate_api_key_disabled(self, clean_redis: RedisKeyManager, disabled_api_key: APIKeyDocument):
@@ -288,12 +603,11 @@ class TestRedisKeyManager:
         assert result is None
         
         # Check audit log shows denial
-        stream_entries = clean_redis.client.xread(streams={"audit:keylookup": "0"})
-        assert len(stream_entries) == 1
+        entries = await clean_redis.client.xrange("audit:keylookup")
+        assert len(entries) == 1
         
-        stream_name, entries = stream_entries[0]
         entry_id, fields = entries[0]
-        assert fields["result"] == "denied"
+        assert fields[b"result"] == b"denied"
     
     @pytest.mark.asyncio
     async def test_validate_api_key_expired(self, clean_redis: RedisKeyManager, expired_api_key: APIKeyDocument):
@@ -312,12 +626,11 @@ class TestRedisKeyManager:
         assert result is None
         
         # Check audit log shows denial
-        stream_entries = clean_redis.client.xread(streams={"audit:keylookup": "0"})
-        assert len(stream_entries) == 1
+        entries = await clean_redis.client.xrange("audit:keylookup")
+        assert len(entries) == 1
         
-        stream_name, entries = stream_entries[0]
         entry_id, fields = entries[0]
-        assert fields["result"] == "denied"
+        assert fields[b"result"] == b"denied"
     
     @pytest.mark.asyncio
     async def test_validate_api_key_nonexistent(self, clean_redis: RedisKeyManager):
@@ -330,12 +643,11 @@ class TestRedisKeyManager:
         assert result is None
         
         # Check audit log shows denial
-        stream_entries = clean_redis.client.xread(streams={"audit:keylookup": "0"})
-        assert len(stream_entries) == 1
+        entries = await clean_redis.client.xrange("audit:keylookup")
+        assert len(entries) == 1
         
-        stream_name, entries = stream_entries[0]
         entry_id, fields = entries[0]
-        assert fields["result"] == "denied"
+        assert fields[b"result"] == b"denied"
     
     @pytest.mark.asyncio
     async def test_validate_api_key_invalid_format(self, clean_redis: RedisKeyManager):
@@ -348,5 +660,109 @@ class TestRedisKeyManager:
         assert result is None
         
         # Should not create audit log for invalid format
-        stream_entries = clean_redis.client.xread(streams={"audit:keylookup": "0"})
-        assert len(stream_entries) == 0
+        entries = await clean_redis.client.xrange("audit:keylookup")
+        assert len(entries) == 0
+    
+    @pytest.mark.asyncio
+    async def test_validate_api_key_uses_cache(self, clean_redis: RedisKeyManager, sample_api_key: APIKeyDocument):
+        """Test that a cached validation skips the lookup but still audits."""
+        parsed_key = ParsedAPIKey(
+            project_id=sample_api_key.project_id,
+            key_id=sample_api_key.key_id,
+            secret=sample_api_key.plain_secret
+        )
+        api_key = parsed_key.format_key()
+        key_cache = {}
+        
+        # First validation populates the cache
+        result = await clean_redis.validate_api_key(api_key, key_cache)
+        assert result is not None
+        assert (sample_api_key.project_id, sample_api_key.key_id) in key_cache
+        
+        # Second validation is served from the cache
+        hits_before = clean_redis.cache_hits
+        result = await clean_redis.validate_api_key(api_key, key_cache)
+        assert result is not None
+        assert clean_redis.cache_hits == hits_before + 1
+        
+        # Wrong secret must not be served from the cache
+        parsed_key = parsed_key.model_copy(update={"secret": "wrong_secret"})
+        result = await clean_redis.validate_api_key(parsed_key.format_key(), key_cache)
+        assert result is None
+
+
+class TestConnectionPoolSharing:
+    """Test connection pool sharing between managers."""
+    
+    @pytest.mark.asyncio
+    async def test_managers_share_pool_per_credentials(self):
+        """Test that managers with the same settings share one pool."""
+        first = RedisKeyManager(username="pool_test_a")
+        second = RedisKeyManager(username="pool_test_a")
+        other = RedisKeyManager(username="pool_test_b")
+        
+        assert first.pool is second.pool
+        assert other.pool is not first.pool
+        
+        # The pool survives while another manager still uses it
+        await first.close()
+        third = RedisKeyManager(username="pool_test_a")
+        assert third.pool is second.pool
+        
+        for manager in (second, third, other):
+            await manager.close()
+    
+    @pytest.mark.asyncio
+    async def test_close_leaves_injected_client_open(self, monkeypatch):
+        """Test that closing a manager does not close a client it was given."""
+        fake = fakeredis.FakeAsyncRedis(protocol=3)
+        closed = []
+        
+        async def record(name):
+            closed.append(name)
+        
+        monkeypatch.setattr(fake, "aclose", lambda: record("client"))
+        monkeypatch.setattr(fake.connection_pool, "disconnect", lambda **kwargs: record("pool"))
+        
+        await RedisKeyManager(client=fake).close()
+        assert closed == []
+
+
+class TestExampleACL:
+    """Test the example Redis ACL against the commands the scripts run."""
+    
+    @pytest.mark.asyncio
+    async def test_validator_can_run_usage_scripts(self):
+        """Test that the example validator user may run every command ADMIT and USAGE call."""
+        acl_file = Path(__file__).parent.parent / "redis_users.acl.example"
+        rule = next(
+            line for line in acl_file.read_text().splitlines()
+            if line.startswith("user validator ")
+        )
+        
+        server = fakeredis.FakeServer()
+        admin = fakeredis.FakeAsyncRedis(server=server, protocol=3)
+        await admin.execute_command("ACL", "SETUSER", "validator", "reset", *rule.split()[2:], ">test")
+        validator = fakeredis.FakeAsyncRedis(server=server, single_connection_client=True, protocol=3)
+        await validator.auth("test", "validator")
+        
+        # fakeredis applies no ACLs inside Lua, so run each command the
+        # scripts call directly as the validator
+        rate_key = "ratelimit:test_project:k_test123:1"
+        meta_key = "apimeta:test_project:k_test123"
+        calls = {
+            "INCR": ("INCR", rate_key),
+            "EXPIRE": ("EXPIRE", rate_key, 120),
+            "GET": ("GET", rate_key),
+            "TIME": ("TIME",),
+            "HINCRBY": ("HINCRBY", meta_key, "usage_count", 1),
+            "HSET": ("HSET", meta_key, "last_used_ms", 1),
+        }
+        used = set(re.findall(r"redis\.call\('(\w+)'", ADMIT_SCRIPT + USAGE_SCRIPT))
+        assert used <= calls.keys()
+        
+        for name in sorted(used):
+            await validator.execute_command(*calls[name])
+        
+        await validator.aclose()
+        await admin.aclose()
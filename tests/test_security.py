@@ -4,44 +4,52 @@ Tests for security utilities.
 
 import pytest
 import re
+import string
+from collections import Counter
 
 from src.security import PasswordManager, generate_key_id, generate_secret
 
 
+# k_ followed by 7 alphanumeric characters
+KEY_ID_RE = re.compile(r"^k_[a-zA-Z0-9]{7}$")
+
+# Characters secrets.token_urlsafe draws from
+URLSAFE_ALPHABET = string.ascii_letters + string.digits + "-_"
+
+
+REFERENCE_PASSWORD = "test_password_123"
+
+
+@pytest.fixture(scope="module")
+def reference_hash() -> str:
+    """Hash REFERENCE_PASSWORD once for the module's verification tests."""
+    return PasswordManager().hash_password(REFERENCE_PASSWORD)
+
+
 class TestPasswordManager:
     """Test password hashing and verification."""
     
-    def test_password_hashing(self):
+    def test_password_hashing(self, reference_hash: str):
         """Test password hashing."""
-        pm = PasswordManager()
-        password = "test_password_123"
-        
-        hash_str = pm.hash_password(password)
-        
         # Should be an Argon2id hash
-        assert hash_str.startswith("$argon2id$")
-        assert len(hash_str) > 50  # Reasonable hash length
+        assert reference_hash.startswith("$argon2id$")
+        assert len(reference_hash) > 50  # Reasonable hash length
     
-    def test_password_verification_success(self):
+    def test_password_verification_success(self, reference_hash: str):
         """Test successful password verification."""
+        # A fresh manager has an empty verify cache, so this runs Argon2
         pm = PasswordManager()
-        password = "test_password_123"
-        
-        hash_str = pm.hash_password(password)
         
         # Verify correct password
-        assert pm.verify_password(password, hash_str) is True
+        assert pm.verify_password(REFERENCE_PASSWORD, reference_hash) is True
     
-    def test_password_verification_failure(self):
+    def test_password_verification_failure(self, reference_hash: str):
         """Test failed password verification."""
         pm = PasswordManager()
-        password = "test_password_123"
         wrong_password = "wrong_password"
         
-        hash_str = pm.hash_password(password)
-        
         # Verify wrong password
-        assert pm.verify_password(wrong_password, hash_str) is False
+        assert pm.verify_password(wrong_password, reference_hash) is False
     
     def test_password_verification_invalid_hash(self):
         """Test verification with invalid hash."""
@@ -77,6 +85,78 @@ class TestPasswordManager:
         # But both should verify the same password
         assert pm.verify_password(password, hash1) is True
         assert pm.verify_password(password, hash2) is True
+    
+    def test_token_hashing(self):
+        """Test HMAC token hashing is deterministic per pepper."""
+        pm = PasswordManager(pepper="pepper_a")
+        token = "test_token_123"
+        
+        hash_str = pm.hash_token(token)
+        
+        # Should be a hex encoded SHA-256 digest
+        assert re.match(r"^[0-9a-f]{64}$", hash_str)
+        assert pm.hash_token(token) == hash_str
+        assert PasswordManager(pepper="pepper_b").hash_token(token) != hash_str
+    
+    def test_token_verification(self):
+        """Test HMAC token verification."""
+        pm = PasswordManager(pepper="pepper_a")
+        token = "test_token_123"
+        
+        hash_str = pm.hash_token(token)
+        
+        assert pm.verify_token(token, hash_str) is True
+        assert pm.verify_token("wrong_token", hash_str) is False
+    
+    def test_token_verification_constant_time(self, monkeypatch):
+        """Test that HMAC digests are compared with hmac.compare_digest."""
+        import src._fastpath as fastpath
+        
+        calls = []
+        real_compare_digest = fastpath.hmac.compare_digest
+        
+        def recording_compare_digest(a, b):
+            calls.append((a, b))
+            return real_compare_digest(a, b)
+        
+        monkeypatch.setattr(fastpath.hmac, "compare_digest", recording_compare_digest)
+        
+        pm = PasswordManager(pepper="pepper_a")
+        hash_str = pm.hash_token("test_token_123")
+        
+        assert pm.verify_token("wrong_token", hash_str) is False
+        assert pm.verify_token("test_token_123", hash_str) is True
+        assert len(calls) == 2
+    
+    def test_token_verification_legacy_argon2(self):
+        """Test that legacy Argon2id rows still verify."""
+        pm = PasswordManager(pepper="pepper_a")
+        token = "test_token_123"
+        
+        hash_str = pm.hash_password(token)
+        
+        assert pm.verify_token(token, hash_str) is True
+        assert pm.verify_token("wrong_token", hash_str) is False
+    
+    def test_password_verification_cached(self):
+        """Test that a verified hash settles later attempts without Argon2."""
+        pm = PasswordManager()
+        password = "test_password_123"
+        
+        hash_str = pm.hash_password(password)
+        
+        # Failures are not cached
+        assert pm.verify_password("wrong_password", hash_str) is False
+        assert len(pm._verify_cache) == 0
+        
+        assert pm.verify_password(password, hash_str) is True
+        assert len(pm._verify_cache) == 1
+        assert password not in str(list(pm._verify_cache.values()))
+        
+        # Any further Argon2 call would now fail
+        pm.hasher = None
+        assert pm.verify_password(password, hash_str) is True
+        assert pm.verify_password("wrong_password", hash_str) is False
 
 
 class TestKeyGeneration:
@@ -87,15 +167,15 @@ class TestKeyGeneration:
         key_id = generate_key_id()
         
         # Should match pattern k_XXXXXXX (k_ followed by 7 alphanumeric chars)
-        pattern = r"^k_[a-zA-Z0-9]{7}$"
-        assert re.match(pattern, key_id)
+        assert KEY_ID_RE.match(key_id)
     
     def test_generate_key_id_uniqueness(self):
         """Test that generated key IDs are unique."""
         key_ids = [generate_key_id() for _ in range(100)]
         
-        # All should be unique
+        # All should be unique and well formed
         assert len(set(key_ids)) == 100
+        assert all(KEY_ID_RE.match(key_id) for key_id in key_ids)
     
     def test_generate_secret_default_length(self):
         """Test secret generation with default length."""
@@ -126,13 +206,12 @@ class TestKeyGeneration:
         """Test that generated secrets are sufficiently random."""
         secret = generate_secret(1000)  # Long secret for statistical analysis
         
-        # Check character distribution
-        char_counts = {}
-        for char in secret:
-            char_counts[char] = char_counts.get(char, 0) + 1
+        # Pearson's chi-square statistic against a uniform distribution over
+        # the 64 URL-safe characters, which has 63 degrees of freedom
+        counts = Counter(secret)
+        assert set(counts) <= set(URLSAFE_ALPHABET)
+        expected = len(secret) / len(URLSAFE_ALPHABET)
+        chi_square = sum((counts[char] - expected) ** 2 / expected for char in URLSAFE_ALPHABET)
         
-        # With 1000 characters and ~64 possible characters,
-        # we expect roughly 15-16 of each on average
-        # Allow for reasonable variation
-        for count in char_counts.values():
-            assert 5 <= count <= 30  # Reasonable range for randomness
+        # 131.7 is the critical value at p = 1e-6 for 63 degrees of freedom
+        assert chi_square < 131.7